@@ -1,15 +1,36 @@
 from flask import Flask, jsonify, abort, request
-from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin
-from utils.helper_functions import serialize_coin, serialize_coin_with_duties, serialize_duty, serialize_ksb, serialize_duty_with_coins, serialize_ksb_with_duties
-from playhouse.shortcuts import model_to_dict
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+from utils.helper_functions import serialize_coin, serialize_coin_with_duties, serialize_coin_tree, select_coin_ksbs, select_ksb_coins, serialize_coins_with_duties, serialize_duty, serialize_ksb_rows, iter_ksb_rows, iter_coins_with_duties, serialize_duty_with_coins, serialize_ksb_with_duties, select_ksbs, find_ksb, resolve_duty_codes, encode_cursor, decode_cursor, parse_fields, split_coin_fields, select_fields, KSB_MODELS, KSB_CODE_REGEX, DUTY_CODE_REGEX, DUTY_FIELDS, KSB_FIELDS, COIN_WITH_DUTIES_FIELDS
+from utils.catalogue_import import read_catalogue, import_catalogue, CatalogueError
+from utils.search import search
+from utils.coverage import select_coverage
+from utils.table_versions import conditional_get, bump_versions
+from utils.cache import cached
+from utils.reference_cache import reference_cache
+from utils.json_provider import FastJSONProvider
+from utils.streaming import should_stream, iterate_rows, stream_json_array
+from utils.compression import compress_response
 import uuid
 import re
+import csv
+import hmac
+import io
 from pg_db_connection import pg_db, database 
 import os
-from peewee import DoesNotExist
+from peewee import chunked
 
 database.initialize(pg_db)
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+MAX_BATCH_SIZE = 1000
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+COVERAGE_PAGE_SIZE = 1000
+MAX_COVERAGE_PAGE_SIZE = 10000
+INSERT_BATCH_SIZE = 100
+# Keeps IN (...) lists under SQLite's limit on bound parameters.
+LOOKUP_BATCH_SIZE = 500
 
 @app.before_request
 def before_request():
@@ -23,31 +44,121 @@ def teardown_request(exception):
     if not os.getenv("TESTING") and not pg_db.is_closed():
         pg_db.close()
 
+def get_page_args(key_length=None):
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+
+    if limit is not None:
+        if not limit.isdecimal() or int(limit) < 1:
+            abort(400, description="Invalid limit. Limit must be a positive integer.")
+        limit = int(limit)
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, key_length)
+        except ValueError:
+            abort(400, description="Invalid cursor.")
+
+    return limit, after
+
+def get_fields(allowed):
+    try:
+        return parse_fields(request.args.get("fields"), allowed)
+    except ValueError as error:
+        abort(400, description=str(error))
+
+def paginated_response(items_list, limit, sort_key, fields=None):
+    # The cursor is taken before fields are picked, so the sort key does not
+    # have to be one of them.
+    next_cursor = None
+    if limit and len(items_list) == limit:
+        next_cursor = encode_cursor(items_list[-1][sort_key])
+    if fields is not None:
+        items_list = list(select_fields(items_list, fields))
+
+    response = jsonify(items_list)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+@app.after_request
+def after_request(response):
+    return compress_response(response)
+
+@app.get("/metrics/db-pool")
+def get_db_pool_metrics():
+    return jsonify(pg_db.pool_stats()), 200
+
+@app.get("/metrics/cache")
+def get_cache_metrics():
+    return jsonify(reference_cache.stats()), 200
+
 @app.errorhandler(400)
 def bad_request(error):
     return jsonify({"description": error.description}), 400
 
+@app.errorhandler(403)
+def forbidden(error):
+    return jsonify({"description": error.description}), 403
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"description": error.description}), 404
 
 
 # GET COINS
+def select_coins_page(limit, after):
+    coins = Coin.select().order_by(Coin.name)
+    if after is not None:
+        coins = coins.where(Coin.name > after)
+    if limit:
+        coins = coins.limit(limit)
+    return coins
+
 @app.get("/v1/coins")
+@conditional_get(Coin)
 def get_coins_v1():
-    coins = Coin.select()
-    coins_list = [serialize_coin(coin) for coin in coins]
-    return jsonify(coins_list), 200
+    limit, after = get_page_args()
+    coins = select_coins_page(limit, after)
+    if should_stream(coins, limit):
+        return stream_json_array(iterate_rows(coins.dicts()))
+
+    coins_list = list(coins.dicts())
+    return paginated_response(coins_list, limit, "name")
 
 @app.get("/v2/coins")
+@conditional_get(Coin, Duty, DutyCoin)
 def get_coins_v2():
-    coins = Coin.select()
-    coins_list = [serialize_coin_with_duties(coin) for coin in coins]
-    return jsonify(coins_list), 200
+    limit, after = get_page_args()
+    fields = get_fields(COIN_WITH_DUTIES_FIELDS)
+    coins = select_coins_page(limit, after)
+
+    if fields is None:
+        if should_stream(coins, limit):
+            return stream_json_array(iter_coins_with_duties(coins, iterate=iterate_rows))
+        coins_list = serialize_coins_with_duties(coins)
+        return paginated_response(coins_list, limit, "name")
+
+    # Duties are only queried if duty fields were asked for, and then only
+    # those columns are selected.
+    coin_fields, duty_fields = split_coin_fields(fields)
+    if duty_fields is None:
+        if should_stream(coins, limit):
+            return stream_json_array(select_fields(iterate_rows(coins.dicts()), coin_fields))
+        return paginated_response(list(coins.dicts()), limit, "name", coin_fields)
+
+    coin_fields = coin_fields + ["duties"]
+    if should_stream(coins, limit):
+        coin_rows = iter_coins_with_duties(coins, iterate=iterate_rows, duty_fields=duty_fields)
+        return stream_json_array(select_fields(coin_rows, coin_fields))
+    coins_list = serialize_coins_with_duties(coins, duty_fields)
+    return paginated_response(coins_list, limit, "name", coin_fields)
 
 
 # GET COIN BY ID
 @app.get("/v1/coins/<coin_id>")
+@conditional_get(Coin)
 def get_coin_by_id_v1(coin_id):
     try:
         uuid_obj = uuid.UUID(coin_id)
@@ -64,6 +175,7 @@ def get_coin_by_id_v1(coin_id):
 
 
 @app.get("/v2/coins/<coin_id>")
+@conditional_get(Coin, Duty, DutyCoin)
 def get_coin_by_id_v2(coin_id):
     try:
         uuid_obj = uuid.UUID(coin_id)
@@ -79,6 +191,44 @@ def get_coin_by_id_v2(coin_id):
     return jsonify(coin_dict), 200
 
 
+# GET COIN CURRICULUM TREE
+@app.get("/v2/coins/<coin_id>/tree")
+@conditional_get(Coin, Duty, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+@cached(Coin, Duty, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+def get_coin_tree(coin_id):
+    try:
+        uuid_obj = uuid.UUID(coin_id)
+    except ValueError:
+        abort(400, description="Invalid Coin ID format. Coin ID must be a UUID (non-integer).")
+
+    try:
+        coin = Coin.get_by_id(uuid_obj)
+    except Coin.DoesNotExist:
+        abort(404, description="Coin not found.")
+
+    coin_tree = serialize_coin_tree(coin)
+    return jsonify(coin_tree), 200
+
+
+# GET KSBS COVERED BY A COIN
+@app.get("/v2/coins/<coin_id>/ksbs")
+@conditional_get(Coin, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+@cached(Coin, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+def get_coin_ksbs(coin_id):
+    try:
+        uuid_obj = uuid.UUID(coin_id)
+    except ValueError:
+        abort(400, description="Invalid Coin ID format. Coin ID must be a UUID (non-integer).")
+
+    try:
+        coin = Coin.get_by_id(uuid_obj)
+    except Coin.DoesNotExist:
+        abort(404, description="Coin not found.")
+
+    ksbs_list = serialize_ksb_rows(select_coin_ksbs(coin).iterator())
+    return jsonify(ksbs_list), 200
+
+
 # POST COIN
 @app.post("/v1/coins")
 def create_coin_v1():
@@ -96,6 +246,7 @@ def create_coin_v1():
         abort(400, description="Coin already exists. Please choose another name.")
 
     new_coin = Coin.create(name=name)
+    bump_versions(Coin)
 
     new_coin_dict = serialize_coin(new_coin)
     return jsonify(new_coin_dict), 201
@@ -115,20 +266,103 @@ def create_coin_v2():
     if Coin.select().where(Coin.name == name).exists():
         abort(400, description="Coin already exists. Please choose another name.")
 
-    new_coin = Coin.create(name=name)
+    duty_codes = data.get("duty_codes", [])
+    if not isinstance(duty_codes, list) or not all(isinstance(code, str) for code in duty_codes):
+        abort(400, description="'duty_codes' must be a list of duty codes")
 
-    duty_codes = data.get("duty_codes", []) 
-    for code in duty_codes:
-        try:
-            duty_obj = Duty.get(Duty.code == code.upper())
-            DutyCoin.create(coin=new_coin, duty=duty_obj)
-        except DoesNotExist:
-            abort(400, description=f"Duty with code '{code}' does not exist.")
+    duties, unknown_codes = resolve_duty_codes(duty_codes)
+    if unknown_codes:
+        abort(400, description=f"Duty with code '{unknown_codes[0]}' does not exist.")
 
-    coin_dict = serialize_coin_with_duties(new_coin)
+    with database.atomic():
+        new_coin = Coin.create(name=name)
+        if duties:
+            DutyCoin.insert_many([{"coin": new_coin.id, "duty": duty.id} for duty in duties]).execute()
+
+    bump_versions(Coin, DutyCoin)
+
+    coin_dict = serialize_coin(new_coin)
+    coin_dict["duties"] = [serialize_duty(duty) for duty in duties]
     return jsonify(coin_dict), 201
 
 
+# POST COINS IN BULK
+@app.post("/v2/coins:batch")
+def create_coins_batch_v2():
+    data = request.json
+
+    if not isinstance(data, list) or not data:
+        abort(400, description="Request body must be a non-empty list of coins.")
+    if len(data) > MAX_BATCH_SIZE:
+        abort(400, description=f"A batch can contain at most {MAX_BATCH_SIZE} coins.")
+
+    errors = []
+    items = []
+    seen_names = set()
+    for index, item in enumerate(data):
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            errors.append({"index": index, "description": "Missing 'name' key in coin."})
+            continue
+
+        name = item["name"].strip()
+        if not name:
+            errors.append({"index": index, "description": "Coin name cannot be empty."})
+            continue
+        if name in seen_names:
+            errors.append({"index": index, "description": "Coin name is repeated in this batch."})
+            continue
+        seen_names.add(name)
+
+        duty_codes = item.get("duty_codes", [])
+        if not isinstance(duty_codes, list) or not all(isinstance(code, str) for code in duty_codes):
+            errors.append({"index": index, "description": "'duty_codes' must be a list of duty codes"})
+            continue
+
+        items.append((index, name, list(dict.fromkeys(code.upper() for code in duty_codes))))
+
+    existing_names = set()
+    for batch in chunked(list(seen_names), LOOKUP_BATCH_SIZE):
+        existing_names.update(coin.name for coin in Coin.select(Coin.name).where(Coin.name.in_(batch)))
+
+    all_codes = {code for _, _, duty_codes in items for code in duty_codes}
+    duties_by_code = {}
+    for batch in chunked(list(all_codes), LOOKUP_BATCH_SIZE):
+        duties_by_code.update((duty.code, duty) for duty in Duty.select().where(Duty.code.in_(batch)))
+
+    for index, name, duty_codes in items:
+        if name in existing_names:
+            errors.append({"index": index, "description": "Coin already exists. Please choose another name."})
+        for code in duty_codes:
+            if code not in duties_by_code:
+                errors.append({"index": index, "description": f"Duty with code '{code}' does not exist."})
+
+    if errors:
+        errors.sort(key=lambda error: error["index"])
+        return jsonify({"description": "No coins were created. Fix the listed errors and try again.", "errors": errors}), 400
+
+    coin_rows = []
+    duty_coin_rows = []
+    coins_list = []
+    for _, name, duty_codes in items:
+        coin_id = uuid.uuid4()
+        coin_rows.append({"id": coin_id, "name": name})
+        duty_coin_rows.extend({"coin": coin_id, "duty": duties_by_code[code].id} for code in duty_codes)
+        coins_list.append({
+            "id": str(coin_id),
+            "name": name,
+            "duties": [serialize_duty(duties_by_code[code]) for code in duty_codes],
+        })
+
+    with database.atomic():
+        for batch in chunked(coin_rows, INSERT_BATCH_SIZE):
+            Coin.insert_many(batch).execute()
+        for batch in chunked(duty_coin_rows, INSERT_BATCH_SIZE):
+            DutyCoin.insert_many(batch).execute()
+
+    bump_versions(Coin, DutyCoin)
+    return jsonify(coins_list), 201
+
+
 # PATCH/UPDATE COIN
 @app.patch("/v1/coins/<coin_id>")
 def update_coin_v1(coin_id):
@@ -152,6 +386,7 @@ def update_coin_v1(coin_id):
 
     coin.name = name
     coin.save()
+    bump_versions(Coin)
 
     coin_dict = serialize_coin(coin)
     return jsonify(coin_dict), 200
@@ -170,6 +405,8 @@ def update_coin_v2(coin_id):
 
     name = data.get("name")
     duty_codes = data.get("duty_codes")
+    add_duty_codes = data.get("add_duty_codes")
+    remove_duty_codes = data.get("remove_duty_codes")
 
     try:
         coin = Coin.get_by_id(uuid_obj)
@@ -180,21 +417,58 @@ def update_coin_v2(coin_id):
         name = name.strip()
         if not name:
             abort(400, description="Coin name cannot be empty.")
-        coin.name = name
-        coin.save()
 
-    if duty_codes is not None:
-        if not isinstance(duty_codes, list):
-            abort(400, description="'duty_codes' must be a list of duty codes")
-        
-        DutyCoin.delete().where(DutyCoin.coin == coin).execute()
+    if duty_codes is not None and (add_duty_codes is not None or remove_duty_codes is not None):
+        abort(400, description="Use either 'duty_codes' or 'add_duty_codes'/'remove_duty_codes', not both.")
 
-        for code in duty_codes:
-            try:
-                duty = Duty.get(Duty.code == code.upper())
-                DutyCoin.create(duty=duty, coin=coin)
-            except Duty.DoesNotExist:
-                abort(400, description=f"Invalid duty code: {code}")
+    for key, codes in [("duty_codes", duty_codes), ("add_duty_codes", add_duty_codes), ("remove_duty_codes", remove_duty_codes)]:
+        if codes is not None and (not isinstance(codes, list) or not all(isinstance(code, str) for code in codes)):
+            abort(400, description=f"'{key}' must be a list of duty codes")
+
+    if duty_codes is not None:
+        duties, unknown_codes = resolve_duty_codes(duty_codes)
+        if unknown_codes:
+            abort(400, description=f"Invalid duty code: {unknown_codes[0]}")
+        duty_ids_to_add = [duty.id for duty in duties]
+        duty_ids_to_remove = None
+    elif add_duty_codes is not None or remove_duty_codes is not None:
+        add_duty_codes = add_duty_codes or []
+        remove_duty_codes = remove_duty_codes or []
+        if {code.upper() for code in add_duty_codes} & {code.upper() for code in remove_duty_codes}:
+            abort(400, description="A duty code cannot be in both 'add_duty_codes' and 'remove_duty_codes'.")
+
+        duties, unknown_codes = resolve_duty_codes(add_duty_codes + remove_duty_codes)
+        if unknown_codes:
+            abort(400, description=f"Invalid duty code: {unknown_codes[0]}")
+        remove_codes = {code.upper() for code in remove_duty_codes}
+        duty_ids_to_add = [duty.id for duty in duties if duty.code not in remove_codes]
+        duty_ids_to_remove = {duty.id for duty in duties if duty.code in remove_codes}
+    else:
+        duty_ids_to_add = None
+
+    with database.atomic():
+        if name is not None:
+            coin.name = name
+            coin.save()
+
+        if duty_ids_to_add is not None:
+            # Only touch the links that change: a full duty_codes list
+            # removes whatever it no longer contains, add/remove lists only
+            # remove what they name.
+            existing_duty_ids = {duty_coin.duty_id for duty_coin in DutyCoin.select(DutyCoin.duty).where(DutyCoin.coin == coin)}
+
+            if duty_ids_to_remove is None:
+                duty_ids_to_remove = existing_duty_ids - set(duty_ids_to_add)
+            else:
+                duty_ids_to_remove &= existing_duty_ids
+            new_duty_ids = [duty_id for duty_id in duty_ids_to_add if duty_id not in existing_duty_ids]
+
+            if duty_ids_to_remove:
+                DutyCoin.delete().where((DutyCoin.coin == coin) & (DutyCoin.duty.in_(list(duty_ids_to_remove)))).execute()
+            if new_duty_ids:
+                DutyCoin.insert_many([{"coin": coin.id, "duty": duty_id} for duty_id in new_duty_ids]).execute()
+
+    bump_versions(Coin, DutyCoin)
 
     coin_dict = serialize_coin_with_duties(coin)
     return jsonify(coin_dict), 200
@@ -217,26 +491,44 @@ def delete_coin(coin_id):
         abort(404, description="Coin not found.")
 
     coin.delete_instance()
+    bump_versions(Coin, DutyCoin)
 
     return jsonify({"message": "Coin has been successfully deleted!"}), 200
 
 
 # GET DUTIES
 @app.get("/duties")
+@conditional_get(Duty)
+@cached(Duty)
 def get_duties():
-    duties = Duty.select()
-    duties_list = [serialize_duty(duty) for duty in duties]
+    limit, after = get_page_args()
+    fields = get_fields(DUTY_FIELDS)
+
+    # code is always selected, since it is the sort key.
+    duties = Duty.select().order_by(Duty.code)
+    if fields is not None:
+        duties = duties.select(*[getattr(Duty, name) for name in DUTY_FIELDS if name in fields or name == "code"])
+    if after is not None:
+        duties = duties.where(Duty.code > after)
+    if limit:
+        duties = duties.limit(limit)
+    if should_stream(duties, limit):
+        rows = iterate_rows(duties.dicts())
+        return stream_json_array(rows if fields is None else select_fields(rows, fields))
 
-    return jsonify(duties_list), 200
+    duties_list = list(duties.dicts())
+
+    return paginated_response(duties_list, limit, "code", fields)
 
 
 # GET DUTY BY CODE WITH ASSOCIATED COINS
 @app.get("/duties/<duty_code>")
+@conditional_get(Duty, Coin, DutyCoin)
+@cached(Duty, Coin, DutyCoin)
 def get_duty_by_code(duty_code):
     duty_code = duty_code.upper()
 
-    regex = r"^D\d+$"
-    if not re.match(regex, duty_code):
+    if not re.match(DUTY_CODE_REGEX, duty_code):
         abort(400, description="Invalid Duty Code format. Duty Code must start with a 'D' (case-insensitive) followed by numbers (e.g., D7 or d7).")
 
     try:
@@ -250,38 +542,56 @@ def get_duty_by_code(duty_code):
 
 # GET KSBS
 @app.get("/ksbs")
+@conditional_get(Knowledge, Skill, Behaviour)
+@cached(Knowledge, Skill, Behaviour)
 def get_ksbs():
-    ksbs_list = []
+    ksb_type = request.args.get("type")
+    code_prefix = request.args.get("code_prefix")
+    limit, after = get_page_args()
+    if after is None:
+        after = request.args.get("after")
 
-    for model, ksb_type in [(Knowledge, "Knowledge"), (Skill, "Skill"), (Behaviour, "Behaviour")]:
-        for ksb in model.select():
-            ksbs_list.append(serialize_ksb(ksb, ksb_type))
+    if ksb_type is not None:
+        ksb_type = ksb_type.capitalize()
+        if ksb_type not in KSB_MODELS:
+            abort(400, description="Invalid KSB type. Type must be 'Knowledge', 'Skill' or 'Behaviour'.")
 
-    return jsonify(ksbs_list), 200
+    if code_prefix is not None:
+        code_prefix = code_prefix.upper()
+
+    if after is not None:
+        after = after.upper()
+        if not re.match(KSB_CODE_REGEX, after):
+            abort(400, description="Invalid 'after' KSB Code. It must be a KSB Code such as K1, S2 or B3b.")
+
+    fields = get_fields(KSB_FIELDS)
+
+    ksbs = select_ksbs(ksb_type=ksb_type, code_prefix=code_prefix, after=after, limit=limit, fields=fields)
+    if ksbs is None:
+        return jsonify([]), 200
+
+    if fields is not None:
+        if should_stream(ksbs, limit):
+            return stream_json_array(select_fields(iterate_rows(ksbs.dicts()), fields))
+        return paginated_response(list(ksbs.dicts()), limit, "code", fields)
+
+    if should_stream(ksbs, limit):
+        return stream_json_array(iter_ksb_rows(iterate_rows(ksbs.tuples())))
+
+    ksbs_list = serialize_ksb_rows(ksbs.tuples().iterator())
+    return paginated_response(ksbs_list, limit, "code")
 
 
 # GET KSB BY KSB CODE WITH ASSOCIATED DUTIES
 @app.get("/ksbs/<ksb_code>")
+@conditional_get(Knowledge, Skill, Behaviour, Duty, DutyKnowledge, DutySkill, DutyBehaviour)
+@cached(Knowledge, Skill, Behaviour, Duty, DutyKnowledge, DutySkill, DutyBehaviour)
 def get_ksb_by_code(ksb_code):
     ksb_code = ksb_code.upper()
-    regex = r"^[KSB]\d+[a-zA-Z]?$"
-    if not re.match(regex, ksb_code):
+    if not re.match(KSB_CODE_REGEX, ksb_code):
         abort(400, description="Invalid KSB Code format. KSB Code must start with 'K', 'S', or 'B', followed by numbers and optionally a letter (e.g., K1, K1a, S2, B3b).")
     
-    ksb = None
-    ksb_type = None
-
-    for model, ksb_type_name in [
-        (Knowledge, "Knowledge"),
-        (Skill, "Skill"),
-        (Behaviour, "Behaviour"),
-    ]:
-        try:
-            ksb = model.get(model.code == ksb_code)
-            ksb_type = ksb_type_name
-            break
-        except model.DoesNotExist:
-            ksb = None
+    ksb, ksb_type = find_ksb(ksb_code)
 
     if not ksb:
         abort(404, description="KSB not found.")
@@ -289,5 +599,126 @@ def get_ksb_by_code(ksb_code):
     ksb_dict = serialize_ksb_with_duties(ksb, ksb_type)
     return jsonify(ksb_dict), 200
 
+
+# GET COINS THAT COVER A KSB
+@app.get("/ksbs/<ksb_code>/coins")
+@conditional_get(Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour, Coin, DutyCoin)
+@cached(Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour, Coin, DutyCoin)
+def get_ksb_coins(ksb_code):
+    ksb_code = ksb_code.upper()
+    if not re.match(KSB_CODE_REGEX, ksb_code):
+        abort(400, description="Invalid KSB Code format. KSB Code must start with 'K', 'S', or 'B', followed by numbers and optionally a letter (e.g., K1, K1a, S2, B3b).")
+
+    ksb, ksb_type = find_ksb(ksb_code)
+
+    if not ksb:
+        abort(404, description="KSB not found.")
+
+    limit, after = get_page_args()
+    coins = select_ksb_coins(ksb, ksb_type, limit=limit, after=after)
+
+    coins_list = list(coins.dicts())
+    return paginated_response(coins_list, limit, "name")
+
+
+# SEARCH DUTIES AND KSBS
+@app.get("/search")
+@conditional_get(Duty, Knowledge, Skill, Behaviour)
+@cached(Duty, Knowledge, Skill, Behaviour)
+def search_duties_and_ksbs():
+    text = request.args.get("q", "").strip()
+    if not text:
+        abort(400, description="Missing search query. Use ?q= to search duties and KSBs.")
+
+    limit, after = get_page_args()
+    if limit is None:
+        limit = SEARCH_PAGE_SIZE
+    if limit > MAX_SEARCH_PAGE_SIZE:
+        abort(400, description=f"Invalid limit. Limit must be no more than {MAX_SEARCH_PAGE_SIZE}.")
+
+    # The cursor is the number of results already returned, since results
+    # are ordered by relevance rather than by a unique column.
+    offset = 0
+    if after is not None:
+        if not after.isdecimal():
+            abort(400, description="Invalid cursor.")
+        offset = int(after)
+
+    results = search(text, limit, offset)
+
+    response = jsonify(results)
+    if len(results) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(str(offset + limit))
+    return response, 200
+
+
+# GET COIN X KSB COVERAGE
+@app.get("/coverage")
+@conditional_get(Coin, Duty, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+@cached(Coin, Duty, DutyCoin, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+def get_coverage():
+    coin_id = request.args.get("coin_id")
+    ksb_type = request.args.get("type")
+
+    limit, after = get_page_args(key_length=3)
+    if limit is None:
+        limit = COVERAGE_PAGE_SIZE
+    if limit > MAX_COVERAGE_PAGE_SIZE:
+        abort(400, description=f"Invalid limit. Limit must be no more than {MAX_COVERAGE_PAGE_SIZE}.")
+
+    if coin_id is not None:
+        try:
+            coin_id = uuid.UUID(coin_id)
+        except ValueError:
+            abort(400, description="Invalid Coin ID format. Coin ID must be a UUID (non-integer).")
+
+    if ksb_type is not None:
+        ksb_type = ksb_type.capitalize()
+        if ksb_type not in KSB_MODELS:
+            abort(400, description="Invalid KSB type. Type must be 'Knowledge', 'Skill' or 'Behaviour'.")
+
+    # The cursor is the last row's coin id, KSB code and duty code.
+    if after is not None:
+        after_coin, after_ksb_code, after_duty_code = after
+        try:
+            after = (uuid.UUID(after_coin), after_ksb_code, after_duty_code)
+        except ValueError:
+            abort(400, description="Invalid cursor.")
+
+    coverage_list = list(select_coverage(coin_id=coin_id, ksb_type=ksb_type, after=after, limit=limit).dicts())
+
+    response = jsonify(coverage_list)
+    if len(coverage_list) == limit:
+        last = coverage_list[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([str(last["coin_id"]), last["ksb_code"], last["via_duty"]])
+    return response, 200
+
+
+# IMPORT CURRICULUM CATALOGUE
+@app.post("/admin/catalogue:import")
+def import_catalogue_admin():
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        abort(403, description="Catalogue import is disabled. Set ADMIN_TOKEN to enable it.")
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {admin_token}"):
+        abort(403, description="Invalid admin token.")
+
+    if request.mimetype == "text/csv":
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+        records = read_catalogue(stream, "csv")
+    elif request.mimetype == "application/json":
+        records = read_catalogue(request.stream, "json")
+    else:
+        abort(400, description="Content-Type must be 'text/csv' or 'application/json'.")
+
+    try:
+        counts = import_catalogue(records)
+    except CatalogueError as error:
+        return jsonify({"description": "Nothing was imported. Fix the listed errors and try again.", "errors": error.errors}), 400
+    except (ValueError, csv.Error) as error:
+        abort(400, description=f"Could not read catalogue: {error}")
+
+    return jsonify(counts), 200
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=5000, debug=False)  
\ No newline at end of file
@@ -0,0 +1,264 @@
+# Optional ASGI app serving the coin GET routes with async handlers and an
+# async Postgres pool (psycopg 3), so one process can keep many slow clients
+# in flight. Queries are built with the same peewee helpers as app.py and the
+# rows go through the same serializers and JSON provider, so response bodies
+# match the Flask app byte for byte.
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5001
+import os
+import re
+import uuid
+from urllib.parse import parse_qsl
+from werkzeug.exceptions import HTTPException, BadRequest, NotFound, MethodNotAllowed
+from app import app as flask_app, select_coins_page
+from models import Coin, Duty, DutyCoin
+from utils.helper_functions import select_coin_duty_rows, attach_duties, encode_cursor, decode_cursor, parse_fields, split_coin_fields, select_fields, COIN_WITH_DUTIES_FIELDS
+
+try:
+    from psycopg.conninfo import make_conninfo
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:
+    AsyncConnectionPool = None
+
+
+class AsyncPostgresDatabase:
+    # Uses the same DB_POOL_* settings as the sync pool in pg_db_connection.py.
+    # The pool is opened when the server starts, not on import.
+    def __init__(self):
+        self.pool = None
+
+    async def open(self):
+        if AsyncConnectionPool is None:
+            raise RuntimeError("The ASGI app needs psycopg and psycopg_pool installed.")
+        self.pool = AsyncConnectionPool(
+            make_conninfo(
+                dbname=os.getenv("DATABASE"),
+                user=os.getenv("DB_USERNAME"),
+                password=os.getenv("DB_PASSWORD"),
+                host=os.getenv("HOST"),
+                port=os.getenv("PORT")
+            ),
+            min_size=int(os.getenv("ASYNC_DB_POOL_MIN_CONNECTIONS", 1)),
+            max_size=int(os.getenv("DB_POOL_MAX_CONNECTIONS", 20)),
+            max_lifetime=int(os.getenv("DB_POOL_STALE_TIMEOUT", 300)),
+            max_idle=int(os.getenv("DB_POOL_IDLE_TIMEOUT", 60)),
+            timeout=int(os.getenv("DB_POOL_WAIT_TIMEOUT", 10)),
+            open=False
+        )
+        await self.pool.open()
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def fetchall(self, sql, params):
+        async with self.pool.connection() as connection:
+            cursor = await connection.execute(sql, params)
+            return await cursor.fetchall()
+
+    async def fetchall_snapshot(self, statements):
+        # Runs (sql, params) pairs one after another on one connection, in one
+        # REPEATABLE READ transaction, so every result is read from the same
+        # snapshot.
+        results = []
+        async with self.pool.connection() as connection:
+            async with connection.transaction():
+                await connection.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                for sql, params in statements:
+                    cursor = await connection.execute(sql, params)
+                    results.append(await cursor.fetchall())
+        return results
+
+
+def convert_rows(query, rows):
+    # Values are converted by each column's field, as peewee would when
+    # running the query itself.
+    converters = [getattr(column, "python_value", None) for column in query.selected_columns]
+    return [
+        tuple(value if convert is None or value is None else convert(value) for convert, value in zip(converters, row))
+        for row in rows
+    ]
+
+
+def rows_to_dicts(query, rows):
+    names = [column.name for column in query.selected_columns]
+    return [dict(zip(names, row)) for row in rows]
+
+
+async def fetch_tuples(db, query):
+    # Peewee writes Postgres queries with %s placeholders, which psycopg 3
+    # accepts as they are.
+    sql, params = query.sql()
+    return convert_rows(query, await db.fetchall(sql, params))
+
+
+async def fetch_dicts(db, query):
+    return rows_to_dicts(query, await fetch_tuples(db, query))
+
+
+async def fetch_snapshot(db, *queries):
+    # For queries whose results are put together, such as a page of coins and
+    # their duties. Running them concurrently would use two connections, and
+    # a write committed in between could leave them disagreeing.
+    results = await db.fetchall_snapshot([query.sql() for query in queries])
+    return [convert_rows(query, rows) for query, rows in zip(queries, results)]
+
+
+def get_page_args(params):
+    limit = params.get("limit")
+    cursor = params.get("cursor")
+
+    if limit is not None:
+        if not limit.isdecimal() or int(limit) < 1:
+            raise BadRequest(description="Invalid limit. Limit must be a positive integer.")
+        limit = int(limit)
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise BadRequest(description="Invalid cursor.")
+
+    return limit, after
+
+
+def get_fields(params, allowed):
+    try:
+        return parse_fields(params.get("fields"), allowed)
+    except ValueError as error:
+        raise BadRequest(description=str(error))
+
+
+def paginated_response(items_list, limit, sort_key, fields=None):
+    headers = {}
+    if limit and len(items_list) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(items_list[-1][sort_key])
+    if fields is not None:
+        items_list = list(select_fields(items_list, fields))
+    return items_list, headers
+
+
+def parse_coin_id(coin_id):
+    try:
+        return uuid.UUID(coin_id)
+    except ValueError:
+        raise BadRequest(description="Invalid Coin ID format. Coin ID must be a UUID (non-integer).")
+
+
+def select_coin_duties(coin_id):
+    return (Duty
+            .select(Duty.id, Duty.code, Duty.name, Duty.description)
+            .join(DutyCoin)
+            .where(DutyCoin.coin == coin_id)
+            .order_by(DutyCoin.id))
+
+
+# GET COINS
+async def get_coins_v1(db, params):
+    limit, after = get_page_args(params)
+    coins_list = await fetch_dicts(db, select_coins_page(limit, after))
+    return paginated_response(coins_list, limit, "name")
+
+
+async def get_coins_v2(db, params):
+    limit, after = get_page_args(params)
+    fields = get_fields(params, COIN_WITH_DUTIES_FIELDS)
+    coins = select_coins_page(limit, after)
+    if fields is None:
+        coin_rows, duty_rows = await fetch_snapshot(db, coins, select_coin_duty_rows(coins))
+        return paginated_response(attach_duties(rows_to_dicts(coins, coin_rows), duty_rows), limit, "name")
+
+    coin_fields, duty_fields = split_coin_fields(fields)
+    if duty_fields is None:
+        return paginated_response(await fetch_dicts(db, coins), limit, "name", coin_fields)
+
+    coin_rows, duty_rows = await fetch_snapshot(db, coins, select_coin_duty_rows(coins, duty_fields))
+    return paginated_response(attach_duties(rows_to_dicts(coins, coin_rows), duty_rows, duty_fields), limit, "name",
+                              coin_fields + ["duties"])
+
+
+# GET COIN BY ID
+async def get_coin_by_id_v1(db, params, coin_id):
+    coins = await fetch_dicts(db, Coin.select().where(Coin.id == parse_coin_id(coin_id)))
+    if not coins:
+        raise NotFound(description="Coin not found.")
+    return coins[0], {}
+
+
+async def get_coin_by_id_v2(db, params, coin_id):
+    uuid_obj = parse_coin_id(coin_id)
+    coin_query = Coin.select().where(Coin.id == uuid_obj)
+    duty_query = select_coin_duties(uuid_obj)
+    coin_rows, duty_rows = await fetch_snapshot(db, coin_query, duty_query)
+    coins = rows_to_dicts(coin_query, coin_rows)
+    if not coins:
+        raise NotFound(description="Coin not found.")
+    coins[0]["duties"] = rows_to_dicts(duty_query, duty_rows)
+    return coins[0], {}
+
+
+ROUTES = [
+    (re.compile(r"^/v1/coins$"), get_coins_v1),
+    (re.compile(r"^/v2/coins$"), get_coins_v2),
+    (re.compile(r"^/v1/coins/([^/]+)$"), get_coin_by_id_v1),
+    (re.compile(r"^/v2/coins/([^/]+)$"), get_coin_by_id_v2),
+]
+
+
+class AsyncApp:
+    def __init__(self, db):
+        self.db = db
+        self.json = flask_app.json
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            status, body, headers = await self.handle(scope)
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            })
+            await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.db.open()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.db.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle(self, scope):
+        # Like request.args.get(), the first value of a repeated parameter wins.
+        params = {}
+        for name, value in parse_qsl(scope["query_string"].decode()):
+            params.setdefault(name, value)
+        headers = {"Content-Type": "application/json"}
+        try:
+            for pattern, view in ROUTES:
+                match = pattern.match(scope["path"])
+                if match:
+                    break
+            else:
+                raise NotFound()
+            if scope["method"] != "GET":
+                headers["Allow"] = "GET"
+                raise MethodNotAllowed()
+
+            body, extra_headers = await view(self.db, params, *match.groups())
+            headers.update(extra_headers)
+            status = 200
+        except HTTPException as error:
+            body = {"description": error.description}
+            status = error.code
+
+        return status, self.json.dumps_bytes(body) + b"\n", headers
+
+
+app = AsyncApp(AsyncPostgresDatabase())
@@ -0,0 +1,127 @@
+# Compares the model instance serializers (str() ids, stdlib json) with the
+# row projection serializers under the stdlib and orjson encoders, for each
+# list endpoint, on a seeded SQLite database. Query shapes are the same on
+# both sides, so the difference is serialization and encoding only.
+#
+#   cd backend && python -m benchmarks.bench_json --coins 2000
+import os
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("PORT", "5432")
+
+import argparse
+import json
+import time
+import uuid
+from collections import defaultdict
+from pg_db_connection import database, TEST_DB
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion
+from peewee import chunked
+from app import app
+from utils.json_provider import orjson
+from utils.helper_functions import serialize_coin, serialize_coins_with_duties, serialize_duty, serialize_ksb, serialize_ksb_rows, select_ksbs
+
+TABLES = [Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion]
+
+
+def seed(coins, duties, ksbs, duties_per_coin):
+    duty_rows = [{"id": uuid.uuid4(), "code": f"D{i}", "name": f"Duty {i}", "description": f"Duty {i} description " * 5} for i in range(1, duties + 1)]
+    coin_rows = [{"id": uuid.uuid4(), "name": f"Coin {i}"} for i in range(1, coins + 1)]
+    duty_coin_rows = [
+        {"coin": coin["id"], "duty": duty_rows[(i + j) % duties]["id"]}
+        for i, coin in enumerate(coin_rows) for j in range(duties_per_coin)
+    ]
+
+    with database.atomic():
+        for model, rows in [(Duty, duty_rows), (Coin, coin_rows), (DutyCoin, duty_coin_rows)]:
+            for batch in chunked(rows, 100):
+                model.insert_many(batch).execute()
+        for model in [Knowledge, Skill, Behaviour]:
+            prefix = model.__name__[0]
+            rows = [{"code": f"{prefix}{i}", "name": f"{model.__name__} {i}", "description": f"{model.__name__} {i} description " * 5} for i in range(1, ksbs + 1)]
+            for batch in chunked(rows, 100):
+                model.insert_many(batch).execute()
+
+
+def old_coins_v1():
+    return [serialize_coin(coin) for coin in Coin.select().order_by(Coin.name)]
+
+
+def old_coins_v2():
+    coins = Coin.select().order_by(Coin.name)
+    duties_by_coin = defaultdict(list)
+    for duty_coin in DutyCoin.select(DutyCoin, Duty).join(Duty).order_by(DutyCoin.id):
+        duties_by_coin[duty_coin.coin_id].append(serialize_duty(duty_coin.duty))
+    return [dict(serialize_coin(coin), duties=duties_by_coin[coin.id]) for coin in coins]
+
+
+def old_duties():
+    return [serialize_duty(duty) for duty in Duty.select().order_by(Duty.code)]
+
+
+def old_ksbs():
+    return [serialize_ksb(ksb, ksb.type) for ksb in select_ksbs()]
+
+
+def new_coins_v1():
+    return list(Coin.select().order_by(Coin.name).dicts())
+
+
+def new_coins_v2():
+    return serialize_coins_with_duties(Coin.select().order_by(Coin.name))
+
+
+def new_duties():
+    return list(Duty.select().order_by(Duty.code).dicts())
+
+
+def new_ksbs():
+    return serialize_ksb_rows(select_ksbs().tuples().iterator())
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--coins", type=int, default=2000)
+    parser.add_argument("--duties", type=int, default=50)
+    parser.add_argument("--ksbs", type=int, default=100)
+    parser.add_argument("--duties-per-coin", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database.initialize(TEST_DB)
+    TEST_DB.connect()
+    TEST_DB.create_tables(TABLES)
+    seed(args.coins, args.duties, args.ksbs, args.duties_per_coin)
+
+    endpoints = [
+        ("/v1/coins", old_coins_v1, new_coins_v1),
+        ("/v2/coins", old_coins_v2, new_coins_v2),
+        ("/duties", old_duties, new_duties),
+        ("/ksbs", old_ksbs, new_ksbs),
+    ]
+
+    def encode_with(use_orjson, obj):
+        app.json.use_orjson = use_orjson and orjson is not None
+        return app.json.dumps_bytes(obj)
+
+    print(f"{'endpoint':<12}{'old (ms)':>12}{'rows+stdlib':>14}{'rows+orjson':>14}{'speed-up':>10}")
+    for url, old_serializer, new_serializer in endpoints:
+        old = best_of(args.repeat, lambda: json.dumps(old_serializer(), sort_keys=True, separators=(",", ":")))
+        rows_stdlib = best_of(args.repeat, lambda: encode_with(False, new_serializer()))
+        rows_orjson = best_of(args.repeat, lambda: encode_with(True, new_serializer()))
+        print(f"{url:<12}{old * 1000:>12.1f}{rows_stdlib * 1000:>14.1f}{rows_orjson * 1000:>14.1f}{old / rows_orjson:>9.1f}x")
+
+    TEST_DB.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Compares request throughput of the Flask development server (what
+# `python3 app.py` runs) with gunicorn as configured in gunicorn.conf.py.
+# Both serve the real app from a seeded SQLite file, while a pool of client
+# threads keeps CONCURRENCY requests in flight against a mix of GET endpoints.
+#
+#   cd backend && python -m benchmarks.bench_serving --workers 4 --threads 4
+import os
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("PORT", "5432")
+
+import argparse
+import http.client
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from peewee import SqliteDatabase
+from pg_db_connection import database
+from benchmarks.bench_json import seed, TABLES
+
+URLS = [
+    "/v1/coins?limit=100",
+    "/v2/coins?limit=50",
+    "/duties",
+    "/ksbs?limit=50",
+    "/ksbs/K1",
+]
+
+
+def wait_until_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited before it was ready")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/duties")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+
+def run_load(port, concurrency, duration):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        nonlocal errors
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own_latencies = []
+        own_errors = 0
+        index = offset
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                connection.request("GET", URLS[index % len(URLS)], headers={"Accept-Encoding": "gzip"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    own_errors += 1
+            except (OSError, http.client.HTTPException):
+                own_errors += 1
+                connection.close()
+            own_latencies.append(time.perf_counter() - started)
+            index += 1
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+            errors += own_errors
+
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+    }
+
+
+def serve(command, env, port, concurrency, duration):
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, process)
+        run_load(port, concurrency, 1)  # warm up
+        return run_load(port, concurrency, duration)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--coins", type=int, default=2000)
+    parser.add_argument("--duties", type=int, default=50)
+    parser.add_argument("--ksbs", type=int, default=100)
+    parser.add_argument("--duties-per-coin", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        db = SqliteDatabase(path)
+        database.initialize(db)
+        db.connect()
+        db.create_tables(TABLES)
+        seed(args.coins, args.duties, args.ksbs, args.duties_per_coin)
+        db.close()
+
+        env = dict(os.environ, BENCH_DB=path, BENCH_PORT=str(args.port), WEB_ACCESS_LOG="")
+        servers = [
+            ("app.run", [sys.executable, "-m", "benchmarks.sqlite_app"]),
+            (f"gunicorn {args.workers}x{args.threads}", [
+                sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                "--bind", f"127.0.0.1:{args.port}",
+                "--workers", str(args.workers), "--threads", str(args.threads),
+                "benchmarks.sqlite_app:app",
+            ]),
+        ]
+
+        print(f"{'server':<16}{'req/s':>10}{'p50 (ms)':>11}{'p95 (ms)':>11}{'errors':>8}")
+        for name, command in servers:
+            result = serve(command, env, args.port, args.concurrency, args.duration)
+            print(f"{name:<16}{result['rps']:>10.1f}{result['p50_ms']:>11.1f}{result['p95_ms']:>11.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
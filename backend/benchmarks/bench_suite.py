@@ -0,0 +1,196 @@
+# Times every serializer in utils/helper_functions.py and every GET endpoint
+# in app.py on a seeded SQLite TEST_DB, counts the queries each one runs, and
+# writes the results to a JSON file. Passing an earlier results file with
+# --compare prints the change for each benchmark and exits with status 1 if
+# anything got slower by more than --threshold and --min-delta-ms (comparing
+# the fastest of --repeat runs) or runs more queries.
+#
+#   cd backend && python -m benchmarks.bench_suite --output before.json
+#   cd backend && python -m benchmarks.bench_suite --output after.json --compare before.json
+#
+# Caches are cleared before every call, so endpoint timings and query counts
+# are for a cache miss, including the table version lookup.
+import os
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("PORT", "5432")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+import peewee
+from pg_db_connection import database, TEST_DB
+from models import Coin, Duty, Knowledge
+from app import app
+from utils.reference_cache import reference_cache
+from utils.table_versions import clear_cached_versions
+from utils.helper_functions import (serialize_coin, serialize_coin_with_duties, serialize_coins_with_duties, iter_coins_with_duties,
+                                    serialize_duty_with_coins, serialize_ksb_rows, serialize_ksb_with_duties, select_ksbs)
+from benchmarks.bench_json import seed, TABLES
+
+
+class QueryCounter:
+    def __init__(self, db):
+        self.count = 0
+        execute_sql = db.execute_sql
+
+        def counting_execute_sql(*args, **kwargs):
+            self.count += 1
+            return execute_sql(*args, **kwargs)
+
+        db.execute_sql = counting_execute_sql
+
+
+def clear_caches():
+    reference_cache.clear()
+    clear_cached_versions()
+
+
+def measure(fn, repeat, counter):
+    clear_caches()
+    before = counter.count
+    fn()
+    queries = counter.count - before
+
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "queries": queries,
+    }
+
+
+def get(client, url):
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200, f"{url} returned {response.status_code}"
+    return request
+
+
+def build_benchmarks(client):
+    coin = Coin.select().order_by(Coin.name).first()
+    duty = Duty.select().order_by(Duty.code).first()
+    ksb = Knowledge.select().order_by(Knowledge.code).first()
+    coins = Coin.select().order_by(Coin.name)
+
+    serializers = {
+        "serialize_coin": lambda: [serialize_coin(coin) for coin in coins],
+        "serialize_coin_with_duties": lambda: serialize_coin_with_duties(coin),
+        "serialize_coins_with_duties": lambda: serialize_coins_with_duties(coins),
+        "iter_coins_with_duties": lambda: list(iter_coins_with_duties(coins)),
+        "serialize_duty_with_coins": lambda: serialize_duty_with_coins(duty),
+        "serialize_ksb_rows": lambda: serialize_ksb_rows(select_ksbs().tuples().iterator()),
+        "serialize_ksb_with_duties": lambda: serialize_ksb_with_duties(ksb, "Knowledge"),
+    }
+
+    urls = [
+        "/v1/coins",
+        "/v1/coins?limit=100",
+        "/v2/coins",
+        "/v2/coins?limit=100",
+        f"/v1/coins/{coin.id}",
+        f"/v2/coins/{coin.id}",
+        "/duties",
+        "/duties?limit=100",
+        f"/duties/{duty.code}",
+        "/ksbs",
+        "/ksbs?type=Skill&limit=100",
+        f"/ksbs/{ksb.code}",
+    ]
+    # Ids differ between runs, so detail endpoints are named by their route.
+    endpoints = {
+        "GET " + url.replace(str(coin.id), "<coin_id>").replace(f"/{duty.code}", "/<duty_code>").replace(f"/{ksb.code}", "/<ksb_code>"): get(client, url)
+        for url in urls
+    }
+
+    return [("serializer", name, fn) for name, fn in serializers.items()] + [("endpoint", name, fn) for name, fn in endpoints.items()]
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    regressions = []
+    print(f"\n{'benchmark':<40}{'before (ms)':>13}{'after (ms)':>12}{'change':>9}{'queries':>10}")
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<40}{'-':>13}{result['min_ms']:>12.2f}{'new':>9}{result['queries']:>10}")
+            continue
+
+        # The fastest run is the least affected by other load on the machine.
+        change = (result["min_ms"] - previous["min_ms"]) / previous["min_ms"] if previous["min_ms"] else 0.0
+        queries = f"{previous['queries']}->{result['queries']}" if previous["queries"] != result["queries"] else str(result["queries"])
+        flags = []
+        if change > threshold and result["min_ms"] - previous["min_ms"] > min_delta_ms:
+            flags.append("slower")
+        if result["queries"] > previous["queries"]:
+            flags.append("more queries")
+        if flags:
+            regressions.append(name)
+        print(f"{name:<40}{previous['min_ms']:>13.2f}{result['min_ms']:>12.2f}{change:>+9.0%}{queries:>10}  {', '.join(flags)}")
+
+    if baseline["scale"] != results["scale"]:
+        print(f"\nWarning: baseline was seeded with {baseline['scale']}, this run with {results['scale']}.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--coins", type=int, default=10000)
+    parser.add_argument("--duties", type=int, default=500)
+    parser.add_argument("--ksbs", type=int, default=100, help="KSBs of each type")
+    parser.add_argument("--duties-per-coin", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="results file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slow-down that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slow-downs smaller than this, which are mostly timer noise")
+    args = parser.parse_args()
+
+    database.initialize(TEST_DB)
+    TEST_DB.connect()
+    TEST_DB.create_tables(TABLES)
+    seed(args.coins, args.duties, args.ksbs, args.duties_per_coin)
+    counter = QueryCounter(TEST_DB)
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "peewee": peewee.__version__,
+        "scale": {"coins": args.coins, "duties": args.duties, "ksbs_per_type": args.ksbs, "duties_per_coin": args.duties_per_coin},
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    print(f"{'benchmark':<40}{'min (ms)':>10}{'median (ms)':>13}{'queries':>9}")
+    with app.test_client() as client:
+        for kind, name, fn in build_benchmarks(client):
+            result = dict(kind=kind, **measure(fn, args.repeat, counter))
+            results["results"][name] = result
+            print(f"{name:<40}{result['min_ms']:>10.2f}{result['median_ms']:>13.2f}{result['queries']:>9}")
+
+    TEST_DB.close()
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# WSGI entry point for benchmarks.bench_serving: the real app, reading from
+# the SQLite file named by BENCH_DB instead of Postgres.
+import os
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("PORT", "5432")
+
+from peewee import SqliteDatabase
+from pg_db_connection import database
+from app import app
+
+database.initialize(SqliteDatabase(os.environ["BENCH_DB"]))
+
+if __name__ == "__main__":
+    # Same server as `python3 app.py`.
+    app.run(host="127.0.0.1", port=int(os.getenv("BENCH_PORT", 5000)), debug=False)
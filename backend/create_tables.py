@@ -1,16 +1,21 @@
-from pg_db_connection import pg_db
-from models import Duty, Coin, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+from pg_db_connection import pg_db, database
+from models import Duty, Coin, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, Coverage
+from migrations import migrate
 from peewee import *
 
 
 def create_tables():
+    database.initialize(pg_db)
     pg_db.connect()
 
     tables = [
         Coin, Duty, Knowledge, Skill, Behaviour,
-        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, Coverage
     ]
     pg_db.create_tables(tables, safe=True)
+    # Migrations add what models.py cannot describe, such as search indexes,
+    # and bring the tables of an existing database up to date.
+    migrate(pg_db)
     print("Database tables created!")
 
     pg_db.close()
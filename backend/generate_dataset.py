@@ -0,0 +1,194 @@
+# Fills the database with a synthetic curriculum of any size, for testing how
+# the API behaves with production-sized data. Popularity is skewed: with
+# --skew above 0, the first duties and KSBs are linked far more often than the
+# rest, following a Zipf distribution, as in the real curriculum.
+#
+#   python generate_dataset.py --coins 10000 --duties 500 --ksbs 100
+#   python generate_dataset.py --sqlite local.db --coins 50000 --skew 1.2
+#
+# Rows are loaded with COPY on PostgreSQL and batched insert_many on SQLite.
+from pg_db_connection import pg_db, database
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion
+from utils.table_versions import bump_versions
+from peewee import SqliteDatabase, PostgresqlDatabase, chunked
+from itertools import accumulate
+import argparse
+import csv
+import io
+import random
+import time
+import uuid
+
+TABLES = [Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion]
+
+# Parents before children, so foreign keys always point at loaded rows.
+LOAD_ORDER = [Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour]
+
+# Older SQLite builds allow at most 999 bound parameters per statement.
+SQLITE_MAX_VARIABLES = 999
+
+VERBS = ["Automate", "Assemble", "Deploy", "Secure", "Monitor", "Design", "Test", "Scale", "Refactor", "Document",
+         "Migrate", "Debug", "Optimise", "Integrate", "Release", "Review", "Harden", "Observe", "Model", "Deliver"]
+SUBJECTS = ["the Pipeline", "Infrastructure", "the Codebase", "Cloud Services", "the Network", "Data Flows",
+            "User Journeys", "the Platform", "APIs", "Containers", "the Backlog", "Incidents", "Releases",
+            "Dashboards", "Environments", "Dependencies", "Access Controls", "Service Levels", "Schemas", "Workloads"]
+KSB_TOPICS = ["version control", "continuous integration", "infrastructure as code", "automated testing",
+              "incident response", "threat modelling", "observability", "cloud architecture", "containerisation",
+              "agile delivery", "data persistence", "release strategies", "stakeholder communication",
+              "security principles", "performance tuning", "configuration management", "code review",
+              "documentation", "accessibility", "ethics and sustainability"]
+KSB_PHRASES = {
+    Knowledge: "Understands {topic}",
+    Skill: "Applies {topic} in practice",
+    Behaviour: "Champions {topic} within the team",
+}
+KSB_JUNCTIONS = [(Knowledge, DutyKnowledge, "knowledge"), (Skill, DutySkill, "skill"), (Behaviour, DutyBehaviour, "behaviour")]
+
+
+def zipf_weights(count, skew):
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def pick(rng, population, cum_weights, count):
+    # Weighted sampling without replacement. Links per parent are small next to
+    # the population, so drawing extra and dropping repeats is cheap.
+    count = min(count, len(population))
+    chosen = {}
+    while len(chosen) < count:
+        for item in rng.choices(population, cum_weights=cum_weights, k=count * 2):
+            chosen.setdefault(item, None)
+            if len(chosen) == count:
+                break
+    return list(chosen)
+
+
+def link_count(rng, mean):
+    # Between 1 and 2 * mean - 1 links, averaging mean.
+    return rng.randint(1, max(1, 2 * mean - 1)) if mean else 0
+
+
+def generate(coins=1000, duties=50, ksbs=50, duties_per_coin=4, ksbs_per_duty=6, skew=1.0, seed=None):
+    rng = random.Random(seed)
+
+    def new_id():
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    data = {}
+    data[Coin] = [
+        {"id": new_id(), "name": f"{VERBS[i % len(VERBS)]} {SUBJECTS[(i // len(VERBS)) % len(SUBJECTS)]} {i + 1}"}
+        for i in range(coins)
+    ]
+    data[Duty] = [
+        {"id": new_id(), "code": f"D{i + 1}",
+         "name": f"{VERBS[(i * 7) % len(VERBS)]} {SUBJECTS[i % len(SUBJECTS)]} (Duty {i + 1})",
+         "description": f"Takes responsibility for work to {VERBS[(i * 7) % len(VERBS)].lower()} {SUBJECTS[i % len(SUBJECTS)].lower()}."}
+        for i in range(duties)
+    ]
+    for model, phrase in KSB_PHRASES.items():
+        prefix = model.__name__[0]
+        data[model] = [
+            {"id": new_id(), "code": f"{prefix}{i + 1}",
+             "name": f"{phrase.format(topic=KSB_TOPICS[i % len(KSB_TOPICS)])} ({prefix}{i + 1})",
+             "description": f"{phrase.format(topic=KSB_TOPICS[i % len(KSB_TOPICS)])} and how it supports the wider organisation."}
+            for i in range(ksbs)
+        ]
+
+    duty_ids = [duty["id"] for duty in data[Duty]]
+    duty_weights = zipf_weights(len(duty_ids), skew)
+    data[DutyCoin] = [
+        {"coin": coin["id"], "duty": duty_id}
+        for coin in data[Coin] if duty_ids
+        for duty_id in pick(rng, duty_ids, duty_weights, link_count(rng, duties_per_coin))
+    ]
+
+    for ksb_model, junction, column in KSB_JUNCTIONS:
+        ksb_ids = [ksb["id"] for ksb in data[ksb_model]]
+        ksb_weights = zipf_weights(len(ksb_ids), skew)
+        data[junction] = [
+            {"duty": duty_id, column: ksb_id}
+            for duty_id in duty_ids if ksb_ids
+            for ksb_id in pick(rng, ksb_ids, ksb_weights, link_count(rng, ksbs_per_duty))
+        ]
+
+    return data
+
+
+def copy_rows(db, model, rows):
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row[column] for column in columns)
+    buffer.seek(0)
+
+    column_names = ", ".join(model._meta.fields[column].column_name for column in columns)
+    cursor = db.cursor()
+    cursor.copy_expert(f'COPY "{model._meta.table_name}" ({column_names}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def load(db, data):
+    # Everything goes in one transaction, so a failed load leaves no rows.
+    with db.atomic():
+        for model in LOAD_ORDER:
+            rows = data.get(model)
+            if not rows:
+                continue
+            if isinstance(db, PostgresqlDatabase):
+                copy_rows(db, model, rows)
+            else:
+                for batch in chunked(rows, SQLITE_MAX_VARIABLES // len(rows[0])):
+                    model.insert_many(batch).execute()
+
+    if isinstance(db, PostgresqlDatabase):
+        db.execute_sql("ANALYZE " + ", ".join(f'"{model._meta.table_name}"' for model in LOAD_ORDER))
+
+    # Tell running API processes that their cached responses are out of date.
+    bump_versions(*LOAD_ORDER)
+
+    return {model._meta.table_name: len(data.get(model, [])) for model in LOAD_ORDER}
+
+
+def clear(db):
+    if isinstance(db, PostgresqlDatabase):
+        db.execute_sql("TRUNCATE " + ", ".join(f'"{model._meta.table_name}"' for model in LOAD_ORDER) + " CASCADE")
+    else:
+        for model in reversed(LOAD_ORDER):
+            model.delete().execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with a synthetic curriculum.")
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--duties", type=int, default=50)
+    parser.add_argument("--ksbs", type=int, default=50, help="KSBs of each type")
+    parser.add_argument("--duties-per-coin", type=int, default=4, help="average duties linked to each coin")
+    parser.add_argument("--ksbs-per-duty", type=int, default=6, help="average KSBs of each type linked to each duty")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for link popularity (0 = uniform)")
+    parser.add_argument("--seed", type=int, help="random seed, for a repeatable dataset")
+    parser.add_argument("--sqlite", metavar="PATH", help="write to this SQLite file instead of PostgreSQL")
+    parser.add_argument("--clear", action="store_true", help="delete existing curriculum rows first")
+    args = parser.parse_args()
+
+    db = SqliteDatabase(args.sqlite, pragmas={"foreign_keys": 1}) if args.sqlite else pg_db
+    database.initialize(db)
+    db.connect()
+    db.create_tables(TABLES, safe=True)
+
+    if args.clear:
+        clear(db)
+
+    started = time.perf_counter()
+    data = generate(args.coins, args.duties, args.ksbs, args.duties_per_coin, args.ksbs_per_duty, args.skew, args.seed)
+    generated = time.perf_counter()
+    counts = load(db, data)
+    loaded = time.perf_counter()
+
+    for table_name, count in counts.items():
+        print(f"{table_name:<16}{count:>10}")
+    print(f"Generated in {generated - started:.2f}s, loaded in {loaded - generated:.2f}s")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
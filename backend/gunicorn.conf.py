@@ -0,0 +1,36 @@
+# Production server settings, used by the Dockerfile:
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Each worker is a separate process with its own interpreter (and GIL), and
+# serves WEB_THREADS requests at a time.
+import multiprocessing
+import os
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+
+# Restart workers after this many requests (plus up to 10% jitter so they do
+# not all restart together). 0 keeps workers running indefinitely.
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# The app is imported once in the master and the workers are forked from it,
+# which shares its memory and makes startup errors fail fast. Importing the
+# app does not open a database connection, so no socket is shared between
+# workers.
+preload_app = True
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+# Every worker gets its own connection pool. One connection per thread is all
+# a worker can use at once, so the pool defaults to that size rather than 20,
+# which keeps workers * threads within Postgres' max_connections.
+# DB_POOL_MAX_CONNECTIONS still overrides it. This has to be set before the
+# app (and pg_db_connection) is imported.
+os.environ.setdefault("DB_POOL_MAX_CONNECTIONS", str(threads))
@@ -0,0 +1,44 @@
+# Imports duties, KSBs and the links between them from a CSV or JSON
+# catalogue, creating new records and updating existing ones by code.
+#
+#   python import_catalogue.py catalogue.csv
+#
+# See "Importing a Curriculum Catalogue" in the README for the file format.
+from pg_db_connection import pg_db, database
+from utils.catalogue_import import read_catalogue, import_catalogue, CatalogueError
+import argparse
+import csv
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a curriculum catalogue.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "json"], help="defaults to the file extension")
+    args = parser.parse_args()
+
+    catalogue_format = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if catalogue_format not in ("csv", "json"):
+        sys.exit("Could not tell the catalogue format from the file name. Use --format csv or --format json.")
+
+    database.initialize(pg_db)
+    pg_db.connect()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as catalogue:
+            counts = import_catalogue(read_catalogue(catalogue, catalogue_format))
+    except CatalogueError as error:
+        for catalogue_error in error.errors:
+            print(f"Record {catalogue_error['index']}: {catalogue_error['description']}", file=sys.stderr)
+        sys.exit("Nothing was imported. Fix the listed errors and try again.")
+    except (ValueError, csv.Error) as error:
+        sys.exit(f"Could not read catalogue: {error}")
+    finally:
+        pg_db.close()
+
+    for name, count in counts.items():
+        print(f"{name:<12}" + ", ".join(f"{value} {key}" for key, value in count.items()))
+
+
+if __name__ == "__main__":
+    main()
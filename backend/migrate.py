@@ -0,0 +1,33 @@
+# Applies pending schema migrations from migrations/ to the PostgreSQL
+# database, without dropping any data.
+#
+#   python migrate.py            apply pending migrations
+#   python migrate.py --status   list migrations and whether they are applied
+from pg_db_connection import pg_db, database
+from migrations import find_migrations, applied_versions, migrate, schema_version
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    database.initialize(pg_db)
+    pg_db.connect()
+
+    if args.status:
+        applied = applied_versions(pg_db)
+        for version, name, _ in find_migrations():
+            print(f"[{'x' if version in applied else ' '}] {version:04d}_{name}")
+    else:
+        applied = migrate(pg_db)
+        if not applied:
+            print("No pending migrations.")
+
+    print(f"Schema version: {schema_version(pg_db)}")
+    pg_db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# Replaces the single-column foreign key indexes on the junction tables with
+# one (other_id, id) index per table. Lookups by duty were already served by
+# the UNIQUE(duty_id, other_id) constraint. The reverse lookups, a coin's or
+# KSB's duties, are ordered by the junction id, so the new index returns them
+# in order without a sort.
+from migrations import create_index, drop_index
+
+TRANSACTIONAL = False
+
+JUNCTIONS = [
+    ("dutycoin", "coin_id"),
+    ("dutyknowledge", "knowledge_id"),
+    ("dutyskill", "skill_id"),
+    ("dutybehaviour", "behaviour_id"),
+]
+
+
+def up(db):
+    for table, column in JUNCTIONS:
+        # The new index is built before the old ones are dropped, so lookups
+        # are never left without one.
+        create_index(db, table, [column, "id"], f"{table}_{column}_id")
+        drop_index(db, f"{table}_{column}")
+        drop_index(db, f"{table}_duty_id")
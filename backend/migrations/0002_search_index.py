@@ -0,0 +1,11 @@
+# Adds the full-text search index used by GET /search. See
+# utils.search.create_search_index. On PostgreSQL, adding the generated
+# column rewrites each searchable table while holding a lock on it, which
+# takes moments at curriculum sizes.
+from utils.search import create_search_index
+
+TRANSACTIONAL = False
+
+
+def up(db):
+    create_search_index(db)
@@ -0,0 +1,7 @@
+# Adds the coverage table and the triggers that keep it up to date. See
+# utils.coverage.create_coverage.
+from utils.coverage import create_coverage
+
+
+def up(db):
+    create_coverage(db)
@@ -0,0 +1,103 @@
+# Versioned schema migrations. Each migration is a module in this package
+# named NNNN_description.py with an up(db) function. Applied versions are
+# recorded in the schemamigration table, so each one runs once per database.
+#
+# New databases are created from models.py and then have every migration
+# applied, so migrations must also work on a schema that already has their
+# changes, for example by using IF NOT EXISTS.
+#
+# Migrations run in a transaction unless the module sets TRANSACTIONAL = False,
+# which PostgreSQL requires for CREATE/DROP INDEX CONCURRENTLY. Those should be
+# written so that running them again after a failure is safe; create_index()
+# and drop_index() below are.
+from models import SchemaMigration
+from peewee import PostgresqlDatabase
+import importlib
+import os
+import re
+
+MIGRATION_MODULE_REGEX = r"^(\d{4})_(\w+)\.py$"
+
+
+def find_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(os.path.dirname(__file__))):
+        match = re.match(MIGRATION_MODULE_REGEX, filename)
+        if match:
+            module = importlib.import_module(f"migrations.{filename[:-3]}")
+            migrations.append((int(match.group(1)), match.group(2), module))
+    return migrations
+
+
+def applied_versions(db):
+    db.create_tables([SchemaMigration], safe=True)
+    return {row.version for row in SchemaMigration.select(SchemaMigration.version)}
+
+
+def pending_migrations(db):
+    applied = applied_versions(db)
+    return [migration for migration in find_migrations() if migration[0] not in applied]
+
+
+def record_migration(version, name):
+    SchemaMigration.insert(version=version, name=name).on_conflict_ignore().execute()
+
+
+def migrate(db, log=print):
+    applied = []
+    for version, name, module in pending_migrations(db):
+        log(f"Applying {version:04d}_{name}")
+        if getattr(module, "TRANSACTIONAL", True):
+            with db.atomic():
+                module.up(db)
+                record_migration(version, name)
+        else:
+            module.up(db)
+            record_migration(version, name)
+        applied.append(version)
+    return applied
+
+
+def schema_version(db):
+    return max(applied_versions(db), default=0)
+
+
+def create_index(db, table, columns, name, unique=False, method=None):
+    # On PostgreSQL the index is built CONCURRENTLY, so writes to the table
+    # carry on while it builds. A failed concurrent build leaves an invalid
+    # index behind, which is dropped and rebuilt on the next run. method
+    # (such as GIN) is only used on PostgreSQL.
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    unique_sql = "UNIQUE " if unique else ""
+    if isinstance(db, PostgresqlDatabase):
+        invalid = db.execute_sql(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = %s AND NOT pg_index.indisvalid", (name,)).fetchone()
+        if invalid:
+            drop_index(db, name)
+        method_sql = f" USING {method}" if method else ""
+        db.execute_sql(f'CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}"{method_sql} ({column_list})')
+    else:
+        db.execute_sql(f'CREATE {unique_sql}INDEX IF NOT EXISTS "{name}" ON "{table}" ({column_list})')
+
+
+def drop_index(db, name):
+    if isinstance(db, PostgresqlDatabase):
+        db.execute_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    else:
+        db.execute_sql(f'DROP INDEX IF EXISTS "{name}"')
+
+
+def create_trigger(db, name, table, event, statements):
+    # Runs statements, which may refer to NEW and OLD, after each row is
+    # changed by event (INSERT, DELETE, UPDATE or UPDATE OF column).
+    # PostgreSQL runs trigger bodies from a function of the same name.
+    body = "; ".join(statements)
+    if isinstance(db, PostgresqlDatabase):
+        db.execute_sql(
+            f'CREATE OR REPLACE FUNCTION "{name}"() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            f"BEGIN {body}; RETURN NULL; END $$")
+        db.execute_sql(f'DROP TRIGGER IF EXISTS "{name}" ON "{table}"')
+        db.execute_sql(f'CREATE TRIGGER "{name}" AFTER {event} ON "{table}" FOR EACH ROW EXECUTE FUNCTION "{name}"()')
+    else:
+        db.execute_sql(f'CREATE TRIGGER IF NOT EXISTS "{name}" AFTER {event} ON "{table}" FOR EACH ROW BEGIN {body}; END')
@@ -1,5 +1,6 @@
 from peewee import *
 from pg_db_connection import database
+import datetime
 import uuid
 
 
@@ -37,27 +38,60 @@ class Behaviour(BaseModel):
 
 
 # Junction Tables
+# Each UNIQUE(duty_id, ...) constraint already indexes lookups by duty, so the
+# foreign keys get no single-column indexes. The composite index serves the
+# reverse lookups (a coin's or KSB's duties), which are ordered by id. Index
+# changes on existing databases are made by migrations, see migrations/.
 class DutyCoin(BaseModel):
-    duty = ForeignKeyField(Duty, backref="duty_coins", on_delete="CASCADE")
-    coin = ForeignKeyField(Coin, backref="coin_duties", on_delete="CASCADE")
+    duty = ForeignKeyField(Duty, backref="duty_coins", on_delete="CASCADE", index=False)
+    coin = ForeignKeyField(Coin, backref="coin_duties", on_delete="CASCADE", index=False)
     class Meta:
         constraints = [SQL('UNIQUE(duty_id, coin_id)')]
+        indexes = ((("coin", "id"), False),)
 
 class DutyKnowledge(BaseModel):
-    duty = ForeignKeyField(Duty, backref="duty_knowledges", on_delete="CASCADE")
-    knowledge = ForeignKeyField(Knowledge, backref="knowledge_duties", on_delete="CASCADE")
+    duty = ForeignKeyField(Duty, backref="duty_knowledges", on_delete="CASCADE", index=False)
+    knowledge = ForeignKeyField(Knowledge, backref="knowledge_duties", on_delete="CASCADE", index=False)
     class Meta:
         constraints = [SQL('UNIQUE(duty_id, knowledge_id)')]
+        indexes = ((("knowledge", "id"), False),)
 
 class DutySkill(BaseModel):
-    duty = ForeignKeyField(Duty, backref="duty_skills", on_delete="CASCADE")
-    skill = ForeignKeyField(Skill, backref="skill_duties", on_delete="CASCADE")
+    duty = ForeignKeyField(Duty, backref="duty_skills", on_delete="CASCADE", index=False)
+    skill = ForeignKeyField(Skill, backref="skill_duties", on_delete="CASCADE", index=False)
     class Meta:
         constraints = [SQL('UNIQUE(duty_id, skill_id)')]
+        indexes = ((("skill", "id"), False),)
 
 class DutyBehaviour(BaseModel):
-    duty = ForeignKeyField(Duty, backref="duty_behaviours", on_delete="CASCADE")
-    behaviour = ForeignKeyField(Behaviour, backref="behaviour_duties", on_delete="CASCADE")
+    duty = ForeignKeyField(Duty, backref="duty_behaviours", on_delete="CASCADE", index=False)
+    behaviour = ForeignKeyField(Behaviour, backref="behaviour_duties", on_delete="CASCADE", index=False)
     class Meta:
         constraints = [SQL('UNIQUE(duty_id, behaviour_id)')]
+        indexes = ((("behaviour", "id"), False),)
 
+
+# Coin x KSB coverage, one row per (coin, KSB, duty linking them). It is
+# derived from DutyCoin and the duty-KSB junctions and kept up to date by
+# triggers on those tables, see utils/coverage.py.
+class Coverage(BaseModel):
+    coin = ForeignKeyField(Coin, on_delete="CASCADE", index=False)
+    duty = ForeignKeyField(Duty, on_delete="CASCADE", index=False)
+    ksb_type = CharField()
+    ksb_id = UUIDField()
+    ksb_code = CharField()
+    duty_code = CharField()
+    class Meta:
+        primary_key = CompositeKey("coin", "ksb_code", "duty_code")
+        indexes = ((("duty", "ksb_id"), False),)
+
+
+class SchemaMigration(BaseModel):
+    version = IntegerField(primary_key=True)
+    name = CharField()
+    applied_at = DateTimeField(default=datetime.datetime.now)
+
+
+class TableVersion(BaseModel):
+    table_name = CharField(primary_key=True)
+    version = IntegerField(default=0)
@@ -1,17 +1,99 @@
 from dotenv import load_dotenv
 from peewee import *
+from playhouse.pool import PooledPostgresqlExtDatabase, locked
+import heapq
 import os
+import time
 
 load_dotenv()
 
 database = DatabaseProxy()
 
-pg_db = PostgresqlDatabase(
+
+class MonitoredPooledPostgresqlDatabase(PooledPostgresqlExtDatabase):
+    # Connections are checked out of the pool on connect() and returned on
+    # close(). Idle connections that have not been used for idle_timeout
+    # seconds are closed whenever a connection is returned.
+    def __init__(self, database, idle_timeout=None, **kwargs):
+        self._idle_timeout = idle_timeout
+        self._returned_at = {}
+        self._checkouts = 0
+        self._checkout_wait_total = 0.0
+        self._checkout_wait_max = 0.0
+        super().__init__(database, **kwargs)
+
+    def connect(self, reuse_if_open=False):
+        started = time.perf_counter()
+        result = super().connect(reuse_if_open)
+        waited = time.perf_counter() - started
+
+        with self._pool_lock:
+            self._checkouts += 1
+            self._checkout_wait_total += waited
+            self._checkout_wait_max = max(self._checkout_wait_max, waited)
+        return result
+
+    @locked
+    def _close(self, conn, close_conn=False):
+        key = self.conn_key(conn)
+        checked_in = not close_conn and key in self._in_use
+
+        super()._close(conn, close_conn)
+
+        self._returned_at.pop(key, None)
+        if checked_in:
+            if any(idle_conn is conn for _, _, idle_conn in self._connections):
+                self._returned_at[key] = time.time()
+            self.close_idle_connections()
+
+    @locked
+    def close_idle_connections(self):
+        if not self._idle_timeout:
+            return 0
+
+        cutoff = time.time() - self._idle_timeout
+        keep = []
+        closed = 0
+        for entry in self._connections:
+            conn = entry[2]
+            key = self.conn_key(conn)
+            if self._returned_at.get(key, cutoff) < cutoff:
+                self._returned_at.pop(key, None)
+                super()._close(conn, close_conn=True)
+                closed += 1
+            else:
+                keep.append(entry)
+
+        if closed:
+            heapq.heapify(keep)
+            self._connections = keep
+        return closed
+
+    @locked
+    def pool_stats(self):
+        in_use = len(self._in_use)
+        return {
+            "max_connections": self._max_connections,
+            "in_use": in_use,
+            "idle": len(self._connections),
+            "utilisation": in_use / self._max_connections if self._max_connections else None,
+            "checkouts": self._checkouts,
+            "checkout_wait_total_seconds": self._checkout_wait_total,
+            "checkout_wait_avg_seconds": self._checkout_wait_total / self._checkouts if self._checkouts else 0.0,
+            "checkout_wait_max_seconds": self._checkout_wait_max,
+        }
+
+
+pg_db = MonitoredPooledPostgresqlDatabase(
     os.getenv('DATABASE'),
     user=os.getenv('DB_USERNAME'),
     password=os.getenv('DB_PASSWORD'),
     host=os.getenv('HOST'),
-    port=int(os.getenv('PORT'))
+    port=int(os.getenv('PORT')),
+    max_connections=int(os.getenv('DB_POOL_MAX_CONNECTIONS', 20)),
+    stale_timeout=int(os.getenv('DB_POOL_STALE_TIMEOUT', 300)),
+    idle_timeout=int(os.getenv('DB_POOL_IDLE_TIMEOUT', 60)),
+    timeout=int(os.getenv('DB_POOL_WAIT_TIMEOUT', 10))
 )
 
-TEST_DB = SqliteDatabase(':memory:')
\ No newline at end of file
+TEST_DB = SqliteDatabase(':memory:')
@@ -1,19 +1,22 @@
 from pg_db_connection import pg_db, database
 from models import (
     Coin, Duty, Knowledge, Skill, Behaviour,
-    DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+    DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, SchemaMigration, Coverage
 )
+from migrations import migrate
 
 database.initialize(pg_db)
 
 pg_db.drop_tables([
-    DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour,
+    Coverage, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, SchemaMigration,
     Coin, Duty, Knowledge, Skill, Behaviour
 ], safe=True)
 
 pg_db.create_tables([
     Coin, Duty, Knowledge, Skill, Behaviour,
-    DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+    DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, Coverage
 ], safe=True)
 
+migrate(pg_db)
+
 print("Tables reset successfully!")
\ No newline at end of file
@@ -1,7 +1,9 @@
 import pytest
 from pg_db_connection import database, TEST_DB
 from app import app as flask_app
-from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, Coverage
+from utils.table_versions import clear_cached_versions, get_versions
+from utils.reference_cache import reference_cache
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -11,16 +13,36 @@ def use_test_db():
     
     TEST_DB.create_tables([
         Coin, Duty, Knowledge, Skill, Behaviour,
-        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion, Coverage
     ])
     
     yield  
     
     TEST_DB.drop_tables([
-        Coin, Duty, Knowledge, Skill, Behaviour,
-        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+        Coverage, Coin, Duty, Knowledge, Skill, Behaviour,
+        DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion
     ])
     TEST_DB.close()
+    clear_cached_versions()
+    reference_cache.clear()
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    # Load table versions up front so query counts only include the queries
+    # made by the endpoint itself, not the conditional GET version lookup.
+    monkeypatch.setattr("utils.table_versions.VERSIONS_TTL", float("inf"))
+    get_versions([])
+
+    executed = []
+    execute_sql = TEST_DB.execute_sql
+
+    def counting_execute_sql(sql, params=None, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, params, *args, **kwargs)
+
+    monkeypatch.setattr(TEST_DB, "execute_sql", counting_execute_sql)
+    return executed
 
 
 @pytest.fixture
@@ -0,0 +1,113 @@
+from asgi import AsyncApp
+from pg_db_connection import TEST_DB
+import asyncio
+import pytest
+import uuid
+
+
+class SqliteAsyncDatabase:
+    # Stands in for the async Postgres pool by running the same SQL on TEST_DB.
+    def __init__(self):
+        self.checkouts = []
+
+    async def fetchall(self, sql, params):
+        self.checkouts.append([sql])
+        return TEST_DB.execute_sql(sql, params).fetchall()
+
+    async def fetchall_snapshot(self, statements):
+        self.checkouts.append([sql for sql, _ in statements])
+        with TEST_DB.atomic():
+            return [TEST_DB.execute_sql(sql, params).fetchall() for sql, params in statements]
+
+
+def asgi_get(path, query_string="", method="GET", db=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query_string.encode(), "headers": []}
+    asyncio.run(AsyncApp(db or SqliteAsyncDatabase())(scope, receive, send))
+
+    start, body = messages
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], headers, body["body"]
+
+
+@pytest.mark.parametrize("path", ["/v1/coins", "/v2/coins"])
+def test_coin_lists_match_flask_responses(client, coins_with_duties, path):
+    status, headers, body = asgi_get(path)
+
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert body == client.get(path).data
+
+
+@pytest.mark.parametrize("path", ["/v1/coins", "/v2/coins"])
+def test_coin_list_pages_match_flask_responses(client, coins_with_duties, path):
+    flask_response = client.get(f"{path}?limit=2")
+    status, headers, body = asgi_get(path, "limit=2")
+
+    assert body == flask_response.data
+    assert headers["x-next-cursor"] == flask_response.headers["X-Next-Cursor"]
+
+    cursor = headers["x-next-cursor"]
+    assert asgi_get(path, f"limit=2&cursor={cursor}")[2] == client.get(f"{path}?limit=2&cursor={cursor}").data
+
+
+@pytest.mark.parametrize("query_string", ["fields=name", "fields=id,duties.code&limit=2", "fields=duties"])
+def test_coin_list_fields_match_flask_responses(client, coins_with_duties, query_string):
+    status, _, body = asgi_get("/v2/coins", query_string)
+
+    assert status == 200
+    assert body == client.get(f"/v2/coins?{query_string}").data
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_coin_detail_matches_flask_response(client, coin_with_duties, version):
+    path = f"/{version}/coins/{coin_with_duties.id}"
+
+    status, _, body = asgi_get(path)
+
+    assert status == 200
+    assert body == client.get(path).data
+
+
+@pytest.mark.parametrize("path, query_string", [
+    ("/v2/coins", ""),
+    ("/v2/coins", "fields=id,duties.code"),
+    ("/v2/coins/{coin_id}", ""),
+])
+def test_coins_and_their_duties_are_read_on_one_connection(coin_with_duties, path, query_string):
+    db = SqliteAsyncDatabase()
+
+    asgi_get(path.format(coin_id=coin_with_duties.id), query_string, db=db)
+
+    assert len(db.checkouts) == 1
+    assert len(db.checkouts[0]) == 2
+
+
+@pytest.mark.parametrize("path, query_string, status_code", [
+    ("/v2/coins/not-a-uuid", "", 400),
+    (f"/v2/coins/{uuid.uuid4()}", "", 404),
+    ("/v1/coins", "limit=0", 400),
+    ("/v1/coins", "limit=²", 400),
+    ("/v1/coins", "cursor=!!", 400),
+    ("/v2/coins", "fields=duties.coins", 400),
+    ("/v3/coins", "", 404),
+])
+def test_errors_match_flask_responses(client, path, query_string, status_code):
+    status, _, body = asgi_get(path, query_string)
+
+    assert status == status_code
+    assert body == client.get(f"{path}?{query_string}").data
+
+
+def test_non_get_requests_are_rejected(coin):
+    status, headers, _ = asgi_get("/v1/coins", method="POST")
+
+    assert status == 405
+    assert headers["allow"] == "GET"
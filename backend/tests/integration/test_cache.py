@@ -0,0 +1,70 @@
+from models import Coin, Duty, DutyCoin, TableVersion
+from utils.table_versions import clear_cached_versions
+
+
+def test_cached_endpoint_is_served_without_querying_database(client, duties, queries):
+    first = client.get("/duties")
+    queries.clear()
+
+    second = client.get("/duties")
+
+    assert queries == []
+    assert second.status_code == 200
+    assert second.json == first.json
+    assert second.content_type == "application/json"
+
+
+def test_cache_is_keyed_by_query_parameters(client, duties):
+    all_duties = client.get("/duties")
+    first_page = client.get("/duties?limit=1")
+
+    assert len(all_duties.json) == 3
+    assert len(first_page.json) == 1
+    assert first_page.headers["X-Next-Cursor"] == client.get("/duties?limit=1").headers["X-Next-Cursor"]
+
+
+def test_coin_write_invalidates_cached_duty_detail(client, duties):
+    assert client.get("/duties/D1").json["coins"] == []
+
+    client.post("/v2/coins", json={"name": "New Coin", "duty_codes": ["D1"]})
+    response = client.get("/duties/D1")
+
+    assert [coin["name"] for coin in response.json["coins"]] == ["New Coin"]
+
+
+def test_cached_entry_is_not_used_after_another_process_bumps_versions(client, duties):
+    assert client.get("/duties/D1").json["coins"] == []
+
+    # Another worker writes, so this process's cache is never invalidated
+    # directly; only the table versions it reads change.
+    coin = Coin.create(name="New Coin")
+    DutyCoin.create(coin=coin, duty=Duty.get(Duty.code == "D1"))
+    TableVersion.insert_many([
+        {"table_name": "coin", "version": 100},
+        {"table_name": "dutycoin", "version": 100},
+    ]).execute()
+    clear_cached_versions()
+
+    response = client.get("/duties/D1")
+
+    assert [coin["name"] for coin in response.json["coins"]] == ["New Coin"]
+
+
+def test_error_responses_are_not_cached(client):
+    assert client.get("/duties/D1").status_code == 404
+
+    Duty.create(code="D1", name="Duty 1", description="Duty 1 Description")
+
+    assert client.get("/duties/D1").status_code == 200
+
+
+def test_cache_metrics_report_hits_and_misses(client, duties):
+    before = client.get("/metrics/cache").json
+    client.get("/duties")
+    client.get("/duties")
+
+    stats = client.get("/metrics/cache").json
+
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["size"] == 1
@@ -0,0 +1,153 @@
+from models import Duty, Knowledge, Skill, DutyKnowledge, DutySkill, DutyBehaviour
+import pytest
+
+ADMIN_TOKEN = "test-admin-token"
+
+CATALOGUE_CSV = """type,code,name,description,ksbs
+Knowledge,K1,Knowledge 1,Knowledge 1 Description,
+Skill,S1,Skill 1,Skill 1 Description,
+Behaviour,B1,Behaviour 1,Behaviour 1 Description,
+Duty,D1,Duty 1,Duty 1 Description,K1;S1;B1
+Duty,D2,Duty 2,Duty 2 Description,k1
+"""
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", ADMIN_TOKEN)
+    return ADMIN_TOKEN
+
+
+def post_catalogue(client, body, content_type="text/csv", token=ADMIN_TOKEN):
+    return client.post(
+        "/admin/catalogue:import",
+        data=body,
+        content_type=content_type,
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_import_is_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+
+    response = post_catalogue(client, CATALOGUE_CSV)
+
+    assert response.status_code == 403
+    assert response.json["description"] == "Catalogue import is disabled. Set ADMIN_TOKEN to enable it."
+
+
+def test_import_rejects_wrong_admin_token(client, admin_token):
+    response = post_catalogue(client, CATALOGUE_CSV, token="wrong")
+
+    assert response.status_code == 403
+    assert response.json["description"] == "Invalid admin token."
+    assert Duty.select().count() == 0
+
+
+def test_csv_import_creates_entities_and_mappings(client, admin_token):
+    response = post_catalogue(client, CATALOGUE_CSV)
+
+    assert response.status_code == 200
+    assert response.json == {
+        "duties": {"created": 2, "updated": 0},
+        "knowledge": {"created": 1, "updated": 0},
+        "skills": {"created": 1, "updated": 0},
+        "behaviours": {"created": 1, "updated": 0},
+        "mappings": {"created": 4, "existing": 0},
+    }
+    assert [duty["code"] for duty in client.get("/ksbs/K1").json["duties"]] == ["D1", "D2"]
+    assert DutySkill.select().count() == 1
+    assert DutyBehaviour.select().count() == 1
+
+
+def test_reimport_updates_entities_by_code_and_keeps_mappings(client, admin_token):
+    post_catalogue(client, CATALOGUE_CSV)
+
+    response = post_catalogue(client, CATALOGUE_CSV.replace("Duty 1 Description", "New Description"))
+
+    assert response.status_code == 200
+    assert response.json["duties"] == {"created": 0, "updated": 2}
+    assert response.json["mappings"] == {"created": 0, "existing": 4}
+    assert Duty.get(Duty.code == "D1").description == "New Description"
+    assert Duty.select().count() == 2
+    assert DutyKnowledge.select().count() == 2
+
+
+def test_json_import_accepts_ksb_lists(client, admin_token):
+    catalogue = [
+        {"type": "Skill", "code": "S2a", "name": "Skill 2a"},
+        {"type": "Duty", "code": "d3", "name": "Duty 3", "description": "Duty 3 Description", "ksbs": ["S2a"]},
+    ]
+
+    response = client.post("/admin/catalogue:import", json=catalogue, headers={"Authorization": f"Bearer {admin_token}"})
+
+    assert response.status_code == 200
+    assert Skill.get(Skill.code == "S2A").name == "Skill 2a"
+    assert [duty["code"] for duty in client.get("/ksbs/S2A").json["duties"]] == ["D3"]
+
+
+def test_invalid_records_are_listed_and_nothing_is_imported(client, admin_token):
+    catalogue = CATALOGUE_CSV + "Duty,D3,Duty 3,,K9\nGoal,G1,Goal 1,,\nKnowledge,S5,Knowledge 5,,\nDuty,D1,Duty 1 again,,\n"
+
+    response = post_catalogue(client, catalogue)
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Nothing was imported. Fix the listed errors and try again."
+    assert response.json["errors"] == [
+        {"index": 5, "description": "Knowledge with code 'K9' does not exist."},
+        {"index": 6, "description": "Invalid type. Type must be 'Duty', 'Knowledge', 'Skill' or 'Behaviour'."},
+        {"index": 7, "description": "Invalid Knowledge code 'S5'. It must start with 'K', such as K1 or K2b."},
+        {"index": 8, "description": "Duty code 'D1' is repeated in this catalogue."},
+    ]
+    assert Duty.select().count() == 0
+    assert Knowledge.select().count() == 0
+
+
+def test_invalid_duty_codes_are_rejected(client, admin_token):
+    response = post_catalogue(client, "type,code,name\nDuty,a/b,Duty A\nDuty,d 7,Duty 7\nDuty,d8,Duty 8\n")
+
+    assert response.status_code == 400
+    assert response.json["errors"] == [
+        {"index": 0, "description": "Invalid Duty code 'A/B'. It must be 'D' followed by numbers, such as D1 or D7."},
+        {"index": 1, "description": "Invalid Duty code 'D 7'. It must be 'D' followed by numbers, such as D1 or D7."},
+    ]
+    assert Duty.select().count() == 0
+
+
+def test_name_used_by_another_code_is_rejected(client, admin_token, duties):
+    response = post_catalogue(client, "type,code,name\nDuty,D9,Duty 1\n")
+
+    assert response.status_code == 400
+    assert response.json["errors"] == [{"index": 0, "description": "Duty name 'Duty 1' is already used by D1."}]
+
+
+@pytest.mark.parametrize("body, content_type, description", [
+    ("type,code", "text/plain", "Content-Type must be 'text/csv' or 'application/json'."),
+    ("{not json", "application/json", "Could not read catalogue: Expecting property name enclosed in double quotes: line 1 column 2 (char 1)"),
+    ('{"type": "Duty"}', "application/json", "Could not read catalogue: A JSON catalogue must be a list of records."),
+])
+def test_unreadable_catalogue_returns_400(client, admin_token, body, content_type, description):
+    response = post_catalogue(client, body, content_type=content_type)
+
+    assert response.status_code == 400
+    assert response.json["description"] == description
+
+
+def test_import_invalidates_cached_reference_data(client, admin_token):
+    assert client.get("/duties").json == []
+
+    post_catalogue(client, CATALOGUE_CSV)
+
+    assert [duty["code"] for duty in client.get("/duties").json] == ["D1", "D2"]
+
+
+def test_large_catalogue_is_written_in_batches(client, admin_token, queries):
+    rows = [f"Knowledge,K{i},Knowledge {i},," for i in range(1, 301)]
+    rows += [f"Duty,D{i},Duty {i},,K{i};K{i + 1}" for i in range(1, 201)]
+    catalogue = "type,code,name,description,ksbs\n" + "\n".join(rows) + "\n"
+
+    response = post_catalogue(client, catalogue)
+
+    assert response.status_code == 200
+    assert response.json["mappings"]["created"] == 400
+    assert len(queries) < 30
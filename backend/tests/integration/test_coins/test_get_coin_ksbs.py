@@ -0,0 +1,62 @@
+from models import Coin, DutyCoin
+import uuid
+
+
+def test_get_coin_ksbs_returns_each_ksb_once(client, ksbs_with_duties):
+    coin = Coin.create(name="Automate")
+    for duty in ksbs_with_duties["duties"]:
+        DutyCoin.create(coin=coin, duty=duty)
+
+    response = client.get(f"/v2/coins/{coin.id}/ksbs")
+
+    assert response.status_code == 200
+    assert response.json == [
+        {"id": str(ksb.id), "code": ksb.code, "name": ksb.name, "description": ksb.description, "type": ksb_type}
+        for ksb, ksb_type in [
+            (ksbs_with_duties["knowledge"], "Knowledge"),
+            (ksbs_with_duties["skill"], "Skill"),
+            (ksbs_with_duties["behaviour"], "Behaviour"),
+        ]
+    ]
+
+
+def test_get_coin_ksbs_only_includes_ksbs_of_the_coins_duties(client, ksbs_with_duties):
+    coin = Coin.create(name="Automate")
+    DutyCoin.create(coin=coin, duty=ksbs_with_duties["duties"][2])
+
+    response = client.get(f"/v2/coins/{coin.id}/ksbs")
+
+    assert [ksb["code"] for ksb in response.json] == ["S1", "B1"]
+
+
+def test_get_coin_ksbs_runs_two_queries(client, ksbs_with_duties, queries):
+    coin = Coin.create(name="Automate")
+    for duty in ksbs_with_duties["duties"]:
+        DutyCoin.create(coin=coin, duty=duty)
+
+    queries.clear()
+    client.get(f"/v2/coins/{coin.id}/ksbs")
+
+    assert len(queries) == 2
+    assert queries[1].count("DISTINCT") == 3
+
+
+def test_get_coin_ksbs_without_duties(client, coin_without_duties):
+    response = client.get(f"/v2/coins/{coin_without_duties.id}/ksbs")
+
+    assert response.status_code == 200
+    assert response.json == []
+
+
+def test_get_coin_ksbs_not_found(client):
+    response = client.get(f"/v2/coins/{uuid.uuid4()}/ksbs")
+
+    assert response.status_code == 404
+    assert response.json["description"] == "Coin not found."
+
+
+def test_get_coin_ksbs_invalid_uuid(client):
+    response = client.get("/v2/coins/invalid_id/ksbs")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid Coin ID format. Coin ID must be a UUID (non-integer)."
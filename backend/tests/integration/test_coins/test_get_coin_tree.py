@@ -0,0 +1,105 @@
+from models import Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+from utils.reference_cache import reference_cache
+import uuid
+
+
+def test_get_coin_tree_returns_duties_with_their_ksbs(client, coin, duty_with_ksb, duties):
+    duty, knowledge, skill, behaviour = duty_with_ksb
+    DutyCoin.create(coin=coin, duty=duty)
+    DutyCoin.create(coin=coin, duty=duties[1])
+
+    response = client.get(f"/v2/coins/{coin.id}/tree")
+
+    assert response.status_code == 200
+    assert response.json == {
+        "id": str(coin.id),
+        "name": coin.name,
+        "duties": [
+            {
+                "id": str(duty.id),
+                "code": duty.code,
+                "name": duty.name,
+                "description": duty.description,
+                "knowledge": [{"id": str(knowledge.id), "code": "K1", "name": "Knowledge 1", "description": "Knowledge 1 Description"}],
+                "skills": [{"id": str(skill.id), "code": "S1", "name": "Skill 1", "description": "Skill 1 Description"}],
+                "behaviours": [{"id": str(behaviour.id), "code": "B1", "name": "Behaviour 1", "description": "Behaviour 1 Description"}],
+            },
+            {
+                "id": str(duties[1].id),
+                "code": duties[1].code,
+                "name": duties[1].name,
+                "description": duties[1].description,
+                "knowledge": [],
+                "skills": [],
+                "behaviours": [],
+            },
+        ],
+    }
+
+
+def test_get_coin_tree_only_includes_the_coins_duties(client, coins, duty_with_ksb, duties):
+    duty, knowledge, _, _ = duty_with_ksb
+    DutyCoin.create(coin=coins[0], duty=duties[1])
+    DutyCoin.create(coin=coins[1], duty=duty)
+    DutyKnowledge.create(duty=duties[1], knowledge=Knowledge.create(code="K2", name="Knowledge 2"))
+
+    response = client.get(f"/v2/coins/{coins[0].id}/tree")
+
+    assert [duty["code"] for duty in response.json["duties"]] == [duties[1].code]
+    assert [ksb["code"] for ksb in response.json["duties"][0]["knowledge"]] == ["K2"]
+
+
+def test_get_coin_tree_shares_ksbs_between_duties(client, coin, duties):
+    skill = Skill.create(code="S1", name="Skill 1")
+    for duty in duties[:2]:
+        DutyCoin.create(coin=coin, duty=duty)
+        DutySkill.create(duty=duty, skill=skill)
+
+    response = client.get(f"/v2/coins/{coin.id}/tree")
+
+    assert [[ksb["code"] for ksb in duty["skills"]] for duty in response.json["duties"]] == [["S1"], ["S1"]]
+
+
+def test_get_coin_tree_without_duties(client, coin_without_duties):
+    response = client.get(f"/v2/coins/{coin_without_duties.id}/tree")
+
+    assert response.status_code == 200
+    assert response.json["duties"] == []
+
+
+def test_get_coin_tree_runs_constant_number_of_queries(client, coin, queries):
+    duty = Duty.create(code="D1", name="Duty 1")
+    DutyCoin.create(coin=coin, duty=duty)
+    DutyKnowledge.create(duty=duty, knowledge=Knowledge.create(code="K1", name="Knowledge 1"))
+
+    queries.clear()
+    client.get(f"/v2/coins/{coin.id}/tree")
+    queries_for_one_duty = len(queries)
+
+    for i in range(2, 12):
+        duty = Duty.create(code=f"D{i}", name=f"Duty {i}")
+        DutyCoin.create(coin=coin, duty=duty)
+        DutyKnowledge.create(duty=duty, knowledge=Knowledge.create(code=f"K{i}", name=f"Knowledge {i}"))
+        DutySkill.create(duty=duty, skill=Skill.create(code=f"S{i}", name=f"Skill {i}"))
+        DutyBehaviour.create(duty=duty, behaviour=Behaviour.create(code=f"B{i}", name=f"Behaviour {i}"))
+    reference_cache.clear()
+
+    queries.clear()
+    response = client.get(f"/v2/coins/{coin.id}/tree")
+
+    assert len(response.json["duties"]) == 11
+    assert len(queries) == queries_for_one_duty == 3
+
+
+def test_get_coin_tree_not_found(client):
+    response = client.get(f"/v2/coins/{uuid.uuid4()}/tree")
+
+    assert response.status_code == 404
+    assert response.json["description"] == "Coin not found."
+
+
+def test_get_coin_tree_invalid_uuid(client):
+    response = client.get("/v2/coins/invalid_id/tree")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid Coin ID format. Coin ID must be a UUID (non-integer)."
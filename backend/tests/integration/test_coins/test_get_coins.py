@@ -1,4 +1,7 @@
+import pytest
 import uuid
+from models import Coin, DutyCoin
+from utils.helper_functions import serialize_coin_with_duties
 
 # GET COINS V1
 def test_get_coins_v1(client, coins):
@@ -121,4 +124,139 @@ def test_get_coins_returns_correct_duty_details_v2(client, coins_with_duties):
         assert len(returned_duties) == len(expected[coin_name])
 
         for duty in returned_duties:
-            assert duty in expected[coin_name]
\ No newline at end of file
+            assert duty in expected[coin_name]
+
+def test_get_coins_v2_matches_per_coin_serializer(client, coins_with_duties):
+    response = client.get("/v2/coins")
+
+    expected = [serialize_coin_with_duties(coin) for coin in Coin.select().order_by(Coin.name)]
+    assert response.json == expected
+
+
+def test_get_coins_v2_runs_constant_number_of_queries(client, coins_with_duties, duties, queries):
+    client.get("/v2/coins")
+    queries_for_five_coins = len(queries)
+
+    for i in range(10):
+        coin = Coin.create(name=f"Extra Coin {i}")
+        for duty in duties:
+            DutyCoin.create(coin=coin, duty=duty)
+
+    queries.clear()
+    client.get("/v2/coins")
+
+    assert queries_for_five_coins == 2
+    assert len(queries) == queries_for_five_coins
+
+
+# PAGINATION
+def test_get_coins_are_ordered_by_name(client, coins):
+    for url in ["/v1/coins", "/v2/coins"]:
+        response = client.get(url)
+        names = [coin["name"] for coin in response.json]
+        assert names == sorted(coin.name for coin in coins)
+
+
+def test_get_coins_without_limit_has_no_next_cursor(client, coins):
+    response = client.get("/v1/coins")
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_coins_pages_through_all_coins_with_cursor(client, coins_with_duties):
+    for url in ["/v1/coins", "/v2/coins"]:
+        names = []
+        response = client.get(f"{url}?limit=2")
+        while True:
+            assert len(response.json) <= 2
+            names.extend(coin["name"] for coin in response.json)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"{url}?limit=2&cursor={cursor}")
+
+        assert names == sorted(coin.name for coin in coins_with_duties)
+
+
+def test_get_coins_v2_page_includes_duties(client, coins_with_duties):
+    first_page = client.get("/v2/coins?limit=2")
+    second_page = client.get(f"/v2/coins?limit=2&cursor={first_page.headers['X-Next-Cursor']}")
+
+    expected = [serialize_coin_with_duties(coin) for coin in Coin.select().order_by(Coin.name).offset(2).limit(2)]
+    assert second_page.json == expected
+
+
+def test_get_coins_returns_400_if_invalid_limit(client):
+    response = client.get("/v2/coins?limit=0")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid limit. Limit must be a positive integer."
+
+
+def test_get_coins_returns_400_if_limit_is_not_a_decimal_number(client):
+    response = client.get("/v1/coins?limit=²")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid limit. Limit must be a positive integer."
+
+
+def test_get_coins_returns_400_if_invalid_cursor(client):
+    response = client.get("/v1/coins?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid cursor."
+
+
+def test_get_coins_v2_fields_limit_coin_and_duty_fields(client, coins_with_duties, queries):
+    queries.clear()
+    response = client.get("/v2/coins?fields=id,name,duties.code")
+    executed = list(queries)
+
+    expected = [
+        {"id": coin["id"], "name": coin["name"], "duties": [{"code": duty["code"]} for duty in coin["duties"]]}
+        for coin in (serialize_coin_with_duties(coin) for coin in Coin.select().order_by(Coin.name))
+    ]
+    assert response.json == expected
+    assert len(executed) == 2
+    assert '"description"' not in executed[1]
+
+
+def test_get_coins_v2_fields_without_duties_skips_the_duty_query(client, coins_with_duties, queries):
+    queries.clear()
+    response = client.get("/v2/coins?fields=name")
+
+    assert len(queries) == 1
+    assert response.json == [{"name": coin.name} for coin in Coin.select().order_by(Coin.name)]
+
+
+def test_get_coins_v2_fields_duties_includes_every_duty_field(client, coins_with_duties):
+    response = client.get("/v2/coins?fields=duties")
+
+    expected = [{"duties": serialize_coin_with_duties(coin)["duties"]} for coin in Coin.select().order_by(Coin.name)]
+    assert response.json == expected
+
+
+@pytest.mark.parametrize("stream", ["0", "1"])
+def test_get_coins_v2_fields_are_the_same_when_streamed(client, coins_with_duties, coin_without_duties, stream):
+    response = client.get(f"/v2/coins?fields=name,duties.name,duties.id&stream={stream}")
+
+    expected = [
+        {"name": coin["name"], "duties": [{"id": duty["id"], "name": duty["name"]} for duty in coin["duties"]]}
+        for coin in (serialize_coin_with_duties(coin) for coin in Coin.select().order_by(Coin.name))
+    ]
+    assert response.json == expected
+
+
+def test_get_coins_v2_fields_page_by_name(client, coins_with_duties):
+    first_page = client.get("/v2/coins?fields=id&limit=2")
+    second_page = client.get(f"/v2/coins?fields=id&limit=2&cursor={first_page.headers['X-Next-Cursor']}")
+
+    assert second_page.json == [{"id": str(coin.id)} for coin in Coin.select().order_by(Coin.name).offset(2).limit(2)]
+
+
+def test_get_coins_v2_returns_400_if_invalid_fields(client):
+    response = client.get("/v2/coins?fields=name,duties.coins")
+
+    assert response.status_code == 400
+    assert response.json["description"] == (
+        "Invalid fields. Fields must be a comma-separated list of: id, name, duties, "
+        "duties.id, duties.code, duties.name, duties.description.")
@@ -1,3 +1,6 @@
+from models import Coin, DutyCoin
+
+
 # PATCH/UPDATE COIN V1
 def test_patch_coin_updates_coin_name_v1(client, coin):
     response = client.patch(f"/v1/coins/{coin.id}", json={"name": "Updated Coin Name"})
@@ -149,4 +152,111 @@ def test_patch_coin_returns_404_if_not_found_v2(client):
     response = client.patch("/v2/coins/00000000-0000-0000-0000-000000000000", json={"name": "Updated Coin Name"})
 
     assert response.status_code == 404
-    assert response.json["description"] == "Coin not found."
\ No newline at end of file
+    assert response.json["description"] == "Coin not found."
+
+def test_patch_coin_with_invalid_duty_code_changes_nothing_v2(client, coin_with_duties, duties):
+    coin = coin_with_duties
+
+    response = client.patch(f"/v2/coins/{coin.id}", json={
+        "name": "Updated Coin Name",
+        "duty_codes": ["D1", "InvalidCode"]
+    })
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid duty code: INVALIDCODE"
+    assert Coin.get_by_id(coin.id).name == coin.name
+    assert DutyCoin.select().where(DutyCoin.coin == coin).count() == len(duties)
+
+
+def test_patch_coin_query_count_does_not_grow_with_duty_codes_v2(client, coin, duties, queries):
+    client.patch(f"/v2/coins/{coin.id}", json={"duty_codes": ["D1"]})
+    queries_for_one_duty = len(queries)
+
+    queries.clear()
+    client.patch(f"/v2/coins/{coin.id}", json={"duty_codes": ["D1", "D2", "D3"]})
+
+    assert len(queries) == queries_for_one_duty
+
+
+def test_patch_coin_keeps_unchanged_duty_links_v2(client, coin_with_duties, duties):
+    coin = coin_with_duties
+    kept_link = DutyCoin.get((DutyCoin.coin == coin) & (DutyCoin.duty == duties[0]))
+
+    response = client.patch(f"/v2/coins/{coin.id}", json={"duty_codes": ["D1", "D2"]})
+
+    assert response.status_code == 200
+    assert [duty["code"] for duty in response.json["duties"]] == ["D1", "D2"]
+    assert DutyCoin.get((DutyCoin.coin == coin) & (DutyCoin.duty == duties[0])).id == kept_link.id
+
+
+def test_patch_coin_only_deletes_removed_and_inserts_new_links_v2(client, coin, duties, queries):
+    DutyCoin.create(coin=coin, duty=duties[0])
+    DutyCoin.create(coin=coin, duty=duties[1])
+    queries.clear()
+
+    client.patch(f"/v2/coins/{coin.id}", json={"duty_codes": ["D2", "D3"]})
+
+    deletes = [sql for sql in queries if sql.startswith("DELETE")]
+    inserts = [sql for sql in queries if sql.startswith("INSERT") and '"dutycoin"' in sql]
+    assert len(deletes) == 1
+    assert len(inserts) == 1
+    assert {dc.duty.code for dc in DutyCoin.select().where(DutyCoin.coin == coin)} == {"D2", "D3"}
+
+
+def test_patch_coin_with_unchanged_duty_codes_writes_no_links_v2(client, coin_with_duties, queries):
+    queries.clear()
+
+    client.patch(f"/v2/coins/{coin_with_duties.id}", json={"duty_codes": ["D1", "D2", "D3"]})
+
+    assert not [sql for sql in queries if sql.startswith(("DELETE", "INSERT")) and '"dutycoin"' in sql]
+
+
+def test_patch_coin_adds_and_removes_duty_codes_incrementally_v2(client, coin, duties):
+    DutyCoin.create(coin=coin, duty=duties[0])
+    DutyCoin.create(coin=coin, duty=duties[1])
+
+    response = client.patch(f"/v2/coins/{coin.id}", json={
+        "add_duty_codes": ["d3", "D1"],
+        "remove_duty_codes": ["D2"]
+    })
+
+    assert response.status_code == 200
+    assert [duty["code"] for duty in response.json["duties"]] == ["D1", "D3"]
+
+
+def test_patch_coin_remove_duty_code_not_linked_is_ignored_v2(client, coin, duties):
+    DutyCoin.create(coin=coin, duty=duties[0])
+
+    response = client.patch(f"/v2/coins/{coin.id}", json={"remove_duty_codes": ["D2"]})
+
+    assert response.status_code == 200
+    assert [duty["code"] for duty in response.json["duties"]] == ["D1"]
+
+
+def test_patch_coin_returns_400_if_duty_codes_and_incremental_codes_given_v2(client, coin, duties):
+    response = client.patch(f"/v2/coins/{coin.id}", json={"duty_codes": ["D1"], "add_duty_codes": ["D2"]})
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Use either 'duty_codes' or 'add_duty_codes'/'remove_duty_codes', not both."
+
+
+def test_patch_coin_returns_400_if_duty_code_added_and_removed_v2(client, coin, duties):
+    response = client.patch(f"/v2/coins/{coin.id}", json={"add_duty_codes": ["D1"], "remove_duty_codes": ["d1"]})
+
+    assert response.status_code == 400
+    assert response.json["description"] == "A duty code cannot be in both 'add_duty_codes' and 'remove_duty_codes'."
+
+
+def test_patch_coin_returns_400_if_incremental_code_invalid_v2(client, coin, duties):
+    response = client.patch(f"/v2/coins/{coin.id}", json={"add_duty_codes": ["D1"], "remove_duty_codes": ["D99"]})
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid duty code: D99"
+    assert DutyCoin.select().count() == 0
+
+
+def test_patch_coin_returns_400_if_add_duty_codes_not_a_list_v2(client, coin):
+    response = client.patch(f"/v2/coins/{coin.id}", json={"add_duty_codes": "D1"})
+
+    assert response.status_code == 400
+    assert response.json["description"] == "'add_duty_codes' must be a list of duty codes"
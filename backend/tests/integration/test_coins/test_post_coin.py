@@ -1,4 +1,5 @@
 import uuid
+from models import Coin, DutyCoin
 
 # POST COIN V1
 def test_post_coin_creates_coin_v1(client):
@@ -130,4 +131,32 @@ def test_post_coin_returns_400_if_invalid_duty_code_v2(client):
     })
 
     assert response.status_code == 400
-    assert response.json["description"] == "Duty with code 'NON_EXISTENT_DUTY_CODE' does not exist."
\ No newline at end of file
+    assert response.json["description"] == "Duty with code 'NON_EXISTENT_DUTY_CODE' does not exist."
+
+def test_post_coin_with_invalid_duty_code_creates_nothing_v2(client, duties):
+    response = client.post("/v2/coins", json={
+        "name": "Coin Invalid Duty",
+        "duty_codes": ["D1", "D99", "D2"]
+    })
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Duty with code 'D99' does not exist."
+    assert Coin.select().count() == 0
+    assert DutyCoin.select().count() == 0
+
+
+def test_post_coin_returns_400_if_duty_codes_not_a_list_v2(client):
+    response = client.post("/v2/coins", json={"name": "Automate", "duty_codes": "D1"})
+
+    assert response.status_code == 400
+    assert response.json["description"] == "'duty_codes' must be a list of duty codes"
+
+
+def test_post_coin_query_count_does_not_grow_with_duty_codes_v2(client, duties, queries):
+    client.post("/v2/coins", json={"name": "One Duty", "duty_codes": ["D1"]})
+    queries_for_one_duty = len(queries)
+
+    queries.clear()
+    client.post("/v2/coins", json={"name": "Three Duties", "duty_codes": ["D1", "D2", "D3"]})
+
+    assert len(queries) == queries_for_one_duty
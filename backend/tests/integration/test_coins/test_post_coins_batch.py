@@ -0,0 +1,100 @@
+import uuid
+from models import Coin, Duty, DutyCoin
+from peewee import chunked
+
+
+def test_post_coins_batch_creates_all_coins_with_duties(client, duties):
+    response = client.post("/v2/coins:batch", json=[
+        {"name": "Automate", "duty_codes": ["D1", "d2"]},
+        {"name": "Assemble", "duty_codes": ["D3"]},
+        {"name": "Going Deeper"},
+    ])
+    data = response.json
+
+    assert response.status_code == 201
+    assert [coin["name"] for coin in data] == ["Automate", "Assemble", "Going Deeper"]
+    assert [duty["code"] for duty in data[0]["duties"]] == ["D1", "D2"]
+    assert [duty["code"] for duty in data[1]["duties"]] == ["D3"]
+    assert data[2]["duties"] == []
+    assert Coin.select().count() == 3
+    assert DutyCoin.select().count() == 3
+
+
+def test_post_coins_batch_response_matches_get_coin_v2(client, duties):
+    response = client.post("/v2/coins:batch", json=[{"name": "Automate", "duty_codes": ["D1", "D2"]}])
+    created = response.json[0]
+
+    uuid.UUID(created["id"])
+    assert client.get(f"/v2/coins/{created['id']}").json == created
+
+
+def test_post_coins_batch_ignores_repeated_duty_codes(client, duties):
+    response = client.post("/v2/coins:batch", json=[{"name": "Automate", "duty_codes": ["D1", "d1"]}])
+
+    assert response.status_code == 201
+    assert len(response.json[0]["duties"]) == 1
+
+
+def test_post_coins_batch_runs_constant_number_of_queries(client, duties, queries):
+    client.post("/v2/coins:batch", json=[{"name": "Coin 0", "duty_codes": ["D1"]}])
+    queries_for_one_coin = len(queries)
+
+    queries.clear()
+    client.post("/v2/coins:batch", json=[
+        {"name": f"Coin {i}", "duty_codes": ["D1", "D2", "D3"]} for i in range(1, 31)
+    ])
+
+    assert len(queries) == queries_for_one_coin
+
+
+def test_post_coins_batch_keeps_lookups_under_sqlite_parameter_limit(client, queries):
+    for batch in chunked([{"code": f"D{i}", "name": f"Duty {i}"} for i in range(1000)], 100):
+        Duty.insert_many(batch).execute()
+
+    queries.clear()
+    response = client.post("/v2/coins:batch", json=[{"name": f"Coin {i}", "duty_codes": [f"D{i}"]} for i in range(1000)])
+
+    assert response.status_code == 201
+    assert Coin.select().count() == 1000
+    assert DutyCoin.select().count() == 1000
+    assert max(sql.count("?") for sql in queries) <= 999
+
+
+def test_post_coins_batch_reports_errors_per_item_and_creates_nothing(client, duties, coin):
+    response = client.post("/v2/coins:batch", json=[
+        {"name": "Automate", "duty_codes": ["D1"]},
+        {"name": "   "},
+        {"name": coin.name},
+        {"name": "Automate"},
+        {"name": "Assemble", "duty_codes": ["D1", "D99"]},
+        {"duty_codes": ["D1"]},
+        {"name": "Going Deeper", "duty_codes": "D1"},
+    ])
+
+    assert response.status_code == 400
+    assert response.json["description"] == "No coins were created. Fix the listed errors and try again."
+    assert response.json["errors"] == [
+        {"index": 1, "description": "Coin name cannot be empty."},
+        {"index": 2, "description": "Coin already exists. Please choose another name."},
+        {"index": 3, "description": "Coin name is repeated in this batch."},
+        {"index": 4, "description": "Duty with code 'D99' does not exist."},
+        {"index": 5, "description": "Missing 'name' key in coin."},
+        {"index": 6, "description": "'duty_codes' must be a list of duty codes"},
+    ]
+    assert Coin.select().count() == 1
+    assert DutyCoin.select().count() == 0
+
+
+def test_post_coins_batch_returns_400_if_body_is_not_a_list(client):
+    for body in [{"name": "Automate"}, []]:
+        response = client.post("/v2/coins:batch", json=body)
+
+        assert response.status_code == 400
+        assert response.json["description"] == "Request body must be a non-empty list of coins."
+
+
+def test_post_coins_batch_returns_400_if_batch_is_too_large(client):
+    response = client.post("/v2/coins:batch", json=[{"name": f"Coin {i}"} for i in range(1001)])
+
+    assert response.status_code == 400
+    assert response.json["description"] == "A batch can contain at most 1000 coins."
@@ -0,0 +1,99 @@
+import gzip
+import json
+import brotli
+import pytest
+from models import Duty
+from utils import compression
+
+
+@pytest.fixture
+def many_duties():
+    for i in range(1, 41):
+        Duty.create(code=f"D{i}", name=f"Duty {i}", description=f"Duty {i} Description")
+
+
+def test_response_is_gzipped_when_accepted(client, many_duties):
+    plain = client.get("/duties")
+    response = client.get("/duties", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert int(response.headers["Content-Length"]) == len(response.get_data())
+
+
+def test_brotli_is_preferred_when_accepted(client, many_duties):
+    plain = client.get("/duties")
+    response = client.get("/duties", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == plain.get_data()
+
+
+def test_client_quality_values_are_respected(client, many_duties):
+    response = client.get("/duties", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_response_is_not_compressed_without_accept_encoding(client, many_duties):
+    response = client.get("/duties")
+
+    assert "Content-Encoding" not in response.headers
+    assert len(response.json) == 40
+
+
+def test_small_responses_are_not_compressed(client, duties):
+    response = client.get("/duties/D1", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json["code"] == "D1"
+
+
+def test_streamed_responses_are_not_compressed(client, many_duties):
+    response = client.get("/duties?stream=1", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert len(json.loads(response.get_data())) == 40
+
+
+def test_compressed_response_has_encoding_specific_etag(client, many_duties):
+    plain_etag = client.get("/duties").headers["ETag"].strip('"')
+    response = client.get("/duties", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["ETag"] == f'"{plain_etag}-gzip"'
+
+    not_modified = client.get("/duties", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == response.headers["ETag"]
+
+
+def test_cached_responses_are_compressed_once_per_encoding(client, many_duties, monkeypatch):
+    calls = []
+    compress = compression.compress
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+
+    first = client.get("/duties", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/duties", headers={"Accept-Encoding": "gzip"})
+    client.get("/duties", headers={"Accept-Encoding": "br"})
+    client.get("/duties", headers={"Accept-Encoding": "br"})
+
+    assert calls == ["gzip", "br"]
+    assert second.get_data() == first.get_data()
+
+
+def test_uncached_responses_are_compressed_every_time(client, coins, monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 10)
+    calls = []
+    compress = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, encoding: calls.append(encoding) or compress(body, encoding))
+
+    client.get("/v1/coins", headers={"Accept-Encoding": "gzip"})
+    client.get("/v1/coins", headers={"Accept-Encoding": "gzip"})
+
+    assert calls == ["gzip", "gzip"]
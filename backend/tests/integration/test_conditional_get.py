@@ -0,0 +1,86 @@
+from models import Coin, Duty, TableVersion
+from utils.table_versions import get_versions
+
+
+def test_get_endpoints_return_strong_etag(client, coins_with_duties, ksbs):
+    for url in ["/v1/coins", "/v2/coins", f"/v1/coins/{coins_with_duties[0].id}", "/duties", "/duties/D1", "/ksbs", "/ksbs/K1"]:
+        response = client.get(url)
+
+        assert response.status_code == 200
+        etag, weak = response.get_etag()
+        assert etag
+        assert not weak
+
+
+def test_get_returns_304_when_etag_matches(client, coins):
+    etag = client.get("/v1/coins").headers["ETag"]
+
+    response = client.get("/v1/coins", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_304_does_not_query_the_database(client, coins, queries):
+    etag = client.get("/v1/coins").headers["ETag"]
+    queries.clear()
+
+    client.get("/v1/coins", headers={"If-None-Match": etag})
+
+    assert queries == []
+
+
+def test_etag_differs_between_endpoints_and_query_strings(client, coins):
+    etags = {
+        client.get("/v1/coins").headers["ETag"],
+        client.get("/v1/coins?limit=2").headers["ETag"],
+        client.get("/v2/coins").headers["ETag"],
+    }
+    assert len(etags) == 3
+
+
+def test_post_changes_coin_etag(client, coins):
+    etag = client.get("/v1/coins").headers["ETag"]
+
+    client.post("/v1/coins", json={"name": "New Coin"})
+    response = client.get("/v1/coins", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "New Coin" in [coin["name"] for coin in response.json]
+
+
+def test_patch_and_delete_change_coin_etag(client, coin_with_duties):
+    etag = client.get("/v2/coins").headers["ETag"]
+    client.patch(f"/v2/coins/{coin_with_duties.id}", json={"duty_codes": ["D1"]})
+    patched_etag = client.get("/v2/coins").headers["ETag"]
+
+    client.delete(f"/coins/{coin_with_duties.id}")
+    deleted_etag = client.get("/v2/coins").headers["ETag"]
+
+    assert len({etag, patched_etag, deleted_etag}) == 3
+
+
+def test_coin_writes_do_not_change_ksb_etag(client, ksbs):
+    etag = client.get("/ksbs").headers["ETag"]
+
+    client.post("/v1/coins", json={"name": "New Coin"})
+    response = client.get("/ksbs", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_error_responses_have_no_etag(client):
+    response = client.get("/duties/D999")
+
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+def test_bump_versions_increments_table_versions(client, coins):
+    client.post("/v1/coins", json={"name": "New Coin"})
+    client.post("/v1/coins", json={"name": "Another Coin"})
+
+    assert TableVersion.get_by_id("coin").version == 2
+    assert get_versions([Coin, Duty]) == {"coin": 2, "duty": 0}
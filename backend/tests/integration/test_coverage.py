@@ -0,0 +1,182 @@
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, Coverage
+from pg_db_connection import TEST_DB
+from utils.coverage import create_coverage, rebuild_coverage
+from utils.table_versions import bump_versions
+import pytest
+import uuid
+
+
+@pytest.fixture
+def coverage_table():
+    create_coverage(TEST_DB)
+
+
+@pytest.fixture
+def curriculum():
+    duties = [Duty.create(code=f"D{i}", name=f"Duty {i}") for i in range(1, 3)]
+    knowledge = Knowledge.create(code="K1", name="Knowledge 1")
+    skill = Skill.create(code="S1", name="Skill 1")
+    behaviour = Behaviour.create(code="B1", name="Behaviour 1")
+    DutyKnowledge.create(duty=duties[0], knowledge=knowledge)
+    DutySkill.create(duty=duties[0], skill=skill)
+    DutyKnowledge.create(duty=duties[1], knowledge=knowledge)
+    DutyBehaviour.create(duty=duties[1], behaviour=behaviour)
+
+    coin = Coin.create(name="Automate")
+    DutyCoin.create(coin=coin, duty=duties[0])
+    DutyCoin.create(coin=coin, duty=duties[1])
+    return {"coin": coin, "duties": duties, "knowledge": knowledge, "skill": skill, "behaviour": behaviour}
+
+
+def coverage_rows():
+    return sorted(Coverage.select(Coverage.coin, Coverage.ksb_type, Coverage.ksb_code, Coverage.duty_code).tuples())
+
+
+def expected_rows():
+    # Coverage computed from the junction tables, for comparison.
+    rows = []
+    for duty_coin in DutyCoin.select():
+        for ksb_type, junction, field in [("Knowledge", DutyKnowledge, "knowledge"), ("Skill", DutySkill, "skill"), ("Behaviour", DutyBehaviour, "behaviour")]:
+            for link in junction.select().where(junction.duty == duty_coin.duty_id):
+                rows.append((duty_coin.coin_id, ksb_type, getattr(link, field).code, duty_coin.duty.code))
+    return sorted(rows)
+
+
+def test_existing_links_are_filled_in_when_the_table_is_created(curriculum, coverage_table):
+    coin_id = curriculum["coin"].id
+
+    assert coverage_rows() == sorted([
+        (coin_id, "Knowledge", "K1", "D1"),
+        (coin_id, "Skill", "S1", "D1"),
+        (coin_id, "Knowledge", "K1", "D2"),
+        (coin_id, "Behaviour", "B1", "D2"),
+    ])
+
+
+def test_coverage_follows_changes_to_coin_duties(coverage_table, curriculum):
+    coin = Coin.create(name="Assemble")
+    DutyCoin.create(coin=coin, duty=curriculum["duties"][0])
+    DutyCoin.delete().where((DutyCoin.coin == curriculum["coin"]) & (DutyCoin.duty == curriculum["duties"][1])).execute()
+
+    assert coverage_rows() == expected_rows()
+    assert len(coverage_rows()) == 4
+
+
+def test_coverage_follows_changes_to_duty_ksbs(coverage_table, curriculum):
+    duties = curriculum["duties"]
+    DutySkill.create(duty=duties[1], skill=curriculum["skill"])
+    DutyKnowledge.delete().where(DutyKnowledge.duty == duties[0]).execute()
+    DutyBehaviour.update(duty=duties[0]).where(DutyBehaviour.duty == duties[1]).execute()
+
+    assert coverage_rows() == expected_rows()
+    assert ("Behaviour", "B1", "D1") in [row[1:] for row in coverage_rows()]
+
+
+def test_coverage_follows_code_changes(coverage_table, curriculum):
+    Knowledge.update(code="K9").where(Knowledge.code == "K1").execute()
+    Duty.update(code="D9").where(Duty.code == "D2").execute()
+
+    assert coverage_rows() == expected_rows()
+
+
+def test_unrelated_updates_leave_coverage_alone(coverage_table, curriculum):
+    Knowledge.update(description="New description").where(Knowledge.code == "K1").execute()
+
+    assert coverage_rows() == expected_rows()
+
+
+def test_rebuild_coverage_matches_incremental_updates(coverage_table, curriculum):
+    DutyCoin.create(coin=Coin.create(name="Assemble"), duty=curriculum["duties"][1])
+    incremental = coverage_rows()
+
+    rebuild_coverage(TEST_DB)
+
+    assert coverage_rows() == incremental == expected_rows()
+
+
+def test_get_coverage_returns_rows_ordered_by_coin_then_ksb_then_duty(client, coverage_table, curriculum):
+    coin = curriculum["coin"]
+
+    response = client.get("/coverage")
+
+    assert response.status_code == 200
+    assert response.json == [
+        {"coin_id": str(coin.id), "coin_name": "Automate", "ksb_type": ksb_type, "ksb_code": ksb_code, "via_duty": duty_code}
+        for ksb_type, ksb_code, duty_code in [
+            ("Behaviour", "B1", "D2"),
+            ("Knowledge", "K1", "D1"),
+            ("Knowledge", "K1", "D2"),
+            ("Skill", "S1", "D1"),
+        ]
+    ]
+
+
+def test_get_coverage_filters_by_coin_and_type(client, coverage_table, curriculum):
+    other = Coin.create(name="Assemble")
+    DutyCoin.create(coin=other, duty=curriculum["duties"][0])
+    bump_versions(DutyCoin)
+
+    by_coin = client.get(f"/coverage?coin_id={other.id}")
+    by_type = client.get("/coverage?type=knowledge")
+
+    assert [(row["ksb_code"], row["via_duty"]) for row in by_coin.json] == [("K1", "D1"), ("S1", "D1")]
+    assert {row["ksb_code"] for row in by_type.json} == {"K1"}
+    assert len(by_type.json) == 3
+
+
+def test_get_coverage_is_paginated(client, coverage_table, curriculum):
+    for i in range(2, 5):
+        DutyCoin.create(coin=Coin.create(name=f"Coin {i}"), duty=curriculum["duties"][0])
+
+    rows = []
+    response = client.get("/coverage?limit=3")
+    while True:
+        rows.extend(response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(f"/coverage?limit=3&cursor={cursor}")
+
+    assert len(rows) == 10
+    assert [(row["coin_id"], row["ksb_code"], row["via_duty"]) for row in rows] == sorted(
+        (str(coin_id), ksb_code, duty_code) for coin_id, _, ksb_code, duty_code in coverage_rows())
+
+
+def test_get_coverage_cursor_works_with_any_characters_in_codes(client, coverage_table, curriculum):
+    Duty.update(code="A/B").where(Duty.code == "D1").execute()
+
+    first_page = client.get("/coverage?limit=1")
+    second_page = client.get(f"/coverage?limit=3&cursor={first_page.headers['X-Next-Cursor']}")
+
+    assert second_page.status_code == 200
+    assert [(row["ksb_code"], row["via_duty"]) for row in first_page.json + second_page.json] == [
+        ("B1", "D2"), ("K1", "A/B"), ("K1", "D2"), ("S1", "A/B"),
+    ]
+
+
+def test_get_coverage_leaves_out_deleted_coins(client, coverage_table, curriculum):
+    Coin.delete().where(Coin.id == curriculum["coin"].id).execute()
+    bump_versions(Coin)
+
+    assert client.get("/coverage").json == []
+
+
+@pytest.mark.parametrize("query_string, description", [
+    ("?coin_id=invalid", "Invalid Coin ID format. Coin ID must be a UUID (non-integer)."),
+    ("?type=Goal", "Invalid KSB type. Type must be 'Knowledge', 'Skill' or 'Behaviour'."),
+    ("?limit=10001", "Invalid limit. Limit must be no more than 10000."),
+    ("?cursor=bm90LWEtY3Vyc29y", "Invalid cursor."),
+    ("?cursor=WyJub3QtYS11dWlkIiwgIksxIiwgIkQxIl0", "Invalid cursor."),
+])
+def test_invalid_coverage_request_returns_400(client, coverage_table, query_string, description):
+    response = client.get(f"/coverage{query_string}")
+
+    assert response.status_code == 400
+    assert response.json["description"] == description
+
+
+def test_get_coverage_for_unknown_coin_is_empty(client, coverage_table, curriculum):
+    response = client.get(f"/coverage?coin_id={uuid.uuid4()}")
+
+    assert response.status_code == 200
+    assert response.json == []
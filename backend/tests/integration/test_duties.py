@@ -1,5 +1,6 @@
+import pytest
 import uuid
-from models import Duty, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+from models import Coin, Duty, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
 
 
 # GET DUTIES
@@ -129,4 +130,67 @@ def test_deleting_duty_cascades_all_ksb_junction_tables(duty_with_ksb):
     assert Duty.select().where(Duty.id == duty.id).count() == 0
     assert DutyKnowledge.select().where(DutyKnowledge.duty == duty).count() == 0
     assert DutySkill.select().where(DutySkill.duty == duty).count() == 0
-    assert DutyBehaviour.select().where(DutyBehaviour.duty == duty).count() == 0
\ No newline at end of file
+    assert DutyBehaviour.select().where(DutyBehaviour.duty == duty).count() == 0
+
+def test_get_duty_by_code_runs_two_queries_regardless_of_coin_count(client, duties, coins_with_duties, queries):
+    duty = duties[0]
+    for i in range(10):
+        DutyCoin.create(coin=Coin.create(name=f"Extra Coin {i}"), duty=duty)
+
+    queries.clear()
+    response = client.get(f"/duties/{duty.code}")
+
+    assert response.status_code == 200
+    assert len(response.json["coins"]) == 14
+    assert len(queries) == 2
+
+
+# GET DUTIES PAGINATION
+def test_get_duties_pages_through_duties_ordered_by_code(client, duties):
+    first_page = client.get("/duties?limit=2")
+    second_page = client.get(f"/duties?limit=2&cursor={first_page.headers['X-Next-Cursor']}")
+
+    assert [duty["code"] for duty in first_page.json] == ["D1", "D2"]
+    assert [duty["code"] for duty in second_page.json] == ["D3"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+def test_get_duties_page_query_seeks_past_cursor_instead_of_offset(client, duties, queries):
+    first_page = client.get("/duties?limit=1")
+    queries.clear()
+    client.get(f"/duties?limit=1&cursor={first_page.headers['X-Next-Cursor']}")
+
+    assert "OFFSET" not in queries[0].upper()
+    assert '"code" > ?' in queries[0]
+
+
+def test_get_duties_returns_only_requested_fields(client, duties, queries):
+    queries.clear()
+    response = client.get("/duties?fields=name, code")
+
+    assert response.status_code == 200
+    assert response.json == [{"code": duty.code, "name": duty.name} for duty in duties]
+    assert '"description"' not in queries[0]
+
+
+def test_get_duties_fields_page_without_the_sort_key(client, duties):
+    first_page = client.get("/duties?fields=name&limit=2")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/duties?fields=name&limit=2&cursor={cursor}")
+
+    assert first_page.json == [{"name": "Duty 1"}, {"name": "Duty 2"}]
+    assert second_page.json == [{"name": "Duty 3"}]
+
+
+def test_get_duties_fields_streamed(client, duties):
+    response = client.get("/duties?fields=id&stream=1")
+
+    assert response.json == [{"id": str(duty.id)} for duty in duties]
+
+
+@pytest.mark.parametrize("fields", ["", "code,coins", "duties.code"])
+def test_get_duties_returns_400_if_invalid_fields(client, fields):
+    response = client.get(f"/duties?fields={fields}")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid fields. Fields must be a comma-separated list of: id, code, name, description."
@@ -1,4 +1,5 @@
-from models import Knowledge, Skill, Behaviour, Duty, DutyKnowledge, DutySkill, DutyBehaviour
+import pytest
+from models import Knowledge, Skill, Behaviour, Duty, DutyKnowledge, DutySkill, DutyBehaviour, Coin, DutyCoin
 import uuid
 
 # GET KSBS
@@ -184,4 +185,213 @@ def test_deleting_behaviour_cascades_duty_behaviour_junction_table(ksbs_with_dut
     behaviour = ksbs_with_duties["behaviour"]
     behaviour.delete_instance(recursive=True)
     assert Behaviour.select().where(Behaviour.id == behaviour.id).count() == 0
-    assert DutyBehaviour.select().where(DutyBehaviour.behaviour == behaviour).count() == 0
\ No newline at end of file
+    assert DutyBehaviour.select().where(DutyBehaviour.behaviour == behaviour).count() == 0
+
+def test_get_ksb_by_code_runs_two_queries_regardless_of_duty_count(client, ksbs_with_duties, queries):
+    knowledge = ksbs_with_duties["knowledge"]
+    for i in range(10):
+        duty = Duty.create(code=f"D{i + 10}", name=f"Duty {i + 10}", description=f"Duty {i + 10} Description")
+        DutyKnowledge.create(duty=duty, knowledge=knowledge)
+
+    queries.clear()
+    response = client.get(f"/ksbs/{knowledge.code}")
+
+    assert response.status_code == 200
+    assert len(response.json["duties"]) == 12
+    assert len(queries) == 2
+
+
+# GET KSBS WITH FILTERS
+@pytest.fixture
+def many_ksbs():
+    for model in [Knowledge, Skill, Behaviour]:
+        prefix = model.__name__[0]
+        for i in range(1, 4):
+            model.create(code=f"{prefix}{i}", name=f"{model.__name__} {i}", description=f"{model.__name__} {i} Description")
+
+
+def test_get_ksbs_returns_ksbs_ordered_by_type_then_code(client, many_ksbs):
+    response = client.get("/ksbs")
+
+    codes = [ksb["code"] for ksb in response.json]
+    assert codes == ["K1", "K2", "K3", "S1", "S2", "S3", "B1", "B2", "B3"]
+
+
+def test_get_ksbs_runs_a_single_query(client, many_ksbs, queries):
+    client.get("/ksbs")
+    assert len(queries) == 1
+
+
+def test_get_ksbs_filters_by_type(client, many_ksbs, queries):
+    response = client.get("/ksbs?type=skill")
+
+    assert response.status_code == 200
+    assert [ksb["code"] for ksb in response.json] == ["S1", "S2", "S3"]
+    assert all(ksb["type"] == "Skill" for ksb in response.json)
+    assert "knowledge" not in queries[0].lower()
+    assert "behaviour" not in queries[0].lower()
+
+
+def test_get_ksbs_filters_by_code_prefix(client, many_ksbs):
+    Knowledge.create(code="K10", name="Knowledge 10", description="Knowledge 10 Description")
+
+    response = client.get("/ksbs?code_prefix=k1")
+
+    assert [ksb["code"] for ksb in response.json] == ["K1", "K10"]
+
+
+def test_get_ksbs_limit_and_after_page_through_all_types(client, many_ksbs):
+    first_page = client.get("/ksbs?limit=4").json
+    second_page = client.get(f"/ksbs?limit=4&after={first_page[-1]['code']}").json
+    third_page = client.get(f"/ksbs?limit=4&after={second_page[-1]['code']}").json
+
+    assert [ksb["code"] for ksb in first_page] == ["K1", "K2", "K3", "S1"]
+    assert [ksb["code"] for ksb in second_page] == ["S2", "S3", "B1", "B2"]
+    assert [ksb["code"] for ksb in third_page] == ["B3"]
+
+
+def test_get_ksbs_type_and_after_can_exclude_everything(client, many_ksbs):
+    response = client.get("/ksbs?type=Knowledge&after=S1")
+
+    assert response.status_code == 200
+    assert response.json == []
+
+
+def test_get_ksbs_returns_400_if_invalid_type(client):
+    response = client.get("/ksbs?type=Attitude")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid KSB type. Type must be 'Knowledge', 'Skill' or 'Behaviour'."
+
+
+def test_get_ksbs_returns_400_if_invalid_limit(client):
+    for limit in ["0", "-1", "ten", "²"]:
+        response = client.get(f"/ksbs?limit={limit}")
+
+        assert response.status_code == 400
+        assert response.json["description"] == "Invalid limit. Limit must be a positive integer."
+
+
+def test_get_ksbs_returns_400_if_invalid_after(client):
+    response = client.get("/ksbs?after=D1")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid 'after' KSB Code. It must be a KSB Code such as K1, S2 or B3b."
+
+
+def test_get_ksb_by_code_queries_only_the_table_for_its_prefix(client, ksbs_with_duties, queries):
+    behaviour = ksbs_with_duties["behaviour"]
+
+    response = client.get(f"/ksbs/{behaviour.code}")
+
+    assert response.status_code == 200
+    assert len(queries) == 2
+    assert '"knowledge"' not in queries[0]
+    assert '"skill"' not in queries[0]
+
+
+def test_get_ksbs_pages_through_all_types_with_cursor(client, many_ksbs):
+    codes = []
+    response = client.get("/ksbs?limit=4")
+    while True:
+        codes.extend(ksb["code"] for ksb in response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(f"/ksbs?limit=4&cursor={cursor}")
+
+    assert codes == ["K1", "K2", "K3", "S1", "S2", "S3", "B1", "B2", "B3"]
+
+
+@pytest.fixture
+def ksb_with_coins(duties):
+    knowledge = Knowledge.create(code="K5", name="Knowledge 5")
+    DutyKnowledge.create(duty=duties[0], knowledge=knowledge)
+    DutyKnowledge.create(duty=duties[1], knowledge=knowledge)
+
+    # "Both" reaches K5 through two duties, "Other" through none.
+    both = Coin.create(name="Both")
+    DutyCoin.create(coin=both, duty=duties[0])
+    DutyCoin.create(coin=both, duty=duties[1])
+    first = Coin.create(name="First")
+    DutyCoin.create(coin=first, duty=duties[0])
+    second = Coin.create(name="Second")
+    DutyCoin.create(coin=second, duty=duties[1])
+    other = Coin.create(name="Other")
+    DutyCoin.create(coin=other, duty=duties[2])
+    return knowledge, [both, first, second]
+
+
+def test_get_ksb_coins_returns_each_coin_once(client, ksb_with_coins):
+    _, coins = ksb_with_coins
+
+    response = client.get("/ksbs/k5/coins")
+
+    assert response.status_code == 200
+    assert response.json == [{"id": str(coin.id), "name": coin.name} for coin in coins]
+
+
+def test_get_ksb_coins_runs_two_queries(client, ksb_with_coins, queries):
+    queries.clear()
+    client.get("/ksbs/K5/coins")
+
+    assert len(queries) == 2
+    assert "DISTINCT" in queries[1]
+
+
+def test_get_ksb_coins_is_paginated(client, ksb_with_coins):
+    first_page = client.get("/ksbs/K5/coins?limit=2")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/ksbs/K5/coins?limit=2&cursor={cursor}")
+
+    assert [coin["name"] for coin in first_page.json] == ["Both", "First"]
+    assert [coin["name"] for coin in second_page.json] == ["Second"]
+
+
+def test_get_ksb_coins_returns_empty_list_when_no_coin_covers_it(client, ksbs):
+    response = client.get("/ksbs/S1/coins")
+
+    assert response.status_code == 200
+    assert response.json == []
+
+
+def test_get_ksb_coins_returns_400_if_invalid_code(client):
+    response = client.get("/ksbs/D1/coins")
+
+    assert response.status_code == 400
+
+
+def test_get_ksb_coins_returns_404_if_not_found(client):
+    response = client.get("/ksbs/K99/coins")
+
+    assert response.status_code == 404
+    assert response.json["description"] == "KSB not found."
+
+
+def test_get_ksbs_returns_only_requested_fields(client, many_ksbs, queries):
+    queries.clear()
+    response = client.get("/ksbs?fields=type,name&type=skill")
+
+    assert response.json == [{"name": f"Skill {i}", "type": "Skill"} for i in range(1, 4)]
+    assert '"description"' not in queries[0]
+    assert '"id"' not in queries[0]
+
+
+def test_get_ksbs_fields_page_through_all_types(client, many_ksbs):
+    names = []
+    response = client.get("/ksbs?fields=name&limit=4")
+    while True:
+        names.extend(ksb["name"] for ksb in response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(f"/ksbs?fields=name&limit=4&cursor={cursor}")
+
+    assert names == [f"{type_name} {i}" for type_name in ["Knowledge", "Skill", "Behaviour"] for i in range(1, 4)]
+
+
+def test_get_ksbs_returns_400_if_invalid_fields(client):
+    response = client.get("/ksbs?fields=code,duties")
+
+    assert response.status_code == 400
+    assert response.json["description"] == "Invalid fields. Fields must be a comma-separated list of: id, code, name, description, type."
@@ -0,0 +1,110 @@
+from models import Duty, Knowledge, Skill, Behaviour
+from pg_db_connection import TEST_DB
+from utils.search import create_search_index
+from utils.table_versions import bump_versions
+from utils.helper_functions import encode_cursor, decode_cursor
+import pytest
+
+
+@pytest.fixture
+def search_index():
+    create_search_index(TEST_DB)
+
+
+@pytest.fixture
+def curriculum():
+    Duty.create(code="D1", name="Monitor production systems", description="Respond to alerts from live services")
+    Duty.create(code="D2", name="Automate deployments", description="Build pipelines that monitor releases")
+    Knowledge.create(code="K1", name="Cloud services", description="Managed hosting platforms")
+    Skill.create(code="S1", name="Write automated tests", description=None)
+    Behaviour.create(code="B1", name="Security first", description="Treat security as part of every change")
+
+
+def codes(response):
+    return [result["code"] for result in response.json]
+
+
+def test_search_returns_matches_across_duties_and_ksbs(client, curriculum, search_index):
+    response = client.get("/search?q=services")
+
+    assert response.status_code == 200
+    assert sorted(codes(response)) == ["D1", "K1"]
+    assert {result["type"] for result in response.json} == {"Duty", "Knowledge"}
+
+
+def test_search_result_fields(client, curriculum, search_index):
+    response = client.get("/search?q=tests")
+
+    skill = Skill.get(Skill.code == "S1")
+    assert response.json == [
+        {"type": "Skill", "id": str(skill.id), "code": "S1", "name": "Write automated tests", "description": None}
+    ]
+
+
+def test_name_matches_rank_above_description_matches(client, curriculum, search_index):
+    response = client.get("/search?q=monitor")
+
+    assert codes(response) == ["D1", "D2"]
+
+
+def test_search_matches_other_forms_of_a_word(client, curriculum, search_index):
+    assert codes(client.get("/search?q=monitoring")) == ["D1", "D2"]
+    assert sorted(codes(client.get("/search?q=AUTOMATION"))) == ["D2", "S1"]
+
+
+def test_search_requires_every_term(client, curriculum, search_index):
+    assert codes(client.get("/search?q=security change")) == ["B1"]
+    assert codes(client.get("/search?q=security deployments")) == []
+
+
+def test_search_can_find_by_code(client, curriculum, search_index):
+    assert codes(client.get("/search?q=k1")) == ["K1"]
+
+
+def test_rows_created_before_the_index_are_searchable(client, search_index, curriculum):
+    assert codes(client.get("/search?q=hosting")) == ["K1"]
+
+
+def test_updated_and_deleted_rows_are_reflected(client, curriculum, search_index):
+    Duty.update(name="Observe production systems").where(Duty.code == "D1").execute()
+    Knowledge.delete().where(Knowledge.code == "K1").execute()
+    bump_versions(Duty, Knowledge)
+
+    assert codes(client.get("/search?q=observe")) == ["D1"]
+    assert codes(client.get("/search?q=monitor")) == ["D2"]
+    assert codes(client.get("/search?q=services")) == ["D1"]
+
+
+def test_search_is_paginated(client, search_index):
+    for i in range(1, 6):
+        Knowledge.create(code=f"K{i}", name=f"Networking {i}", description=None)
+
+    first_page = client.get("/search?q=networking&limit=3")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/search?q=networking&limit=3&cursor={cursor}")
+
+    assert decode_cursor(cursor) == "3"
+    assert codes(first_page) + codes(second_page) == ["K1", "K2", "K3", "K4", "K5"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+def test_search_input_is_not_interpreted_as_query_syntax(client, curriculum, search_index):
+    response = client.get('/search?q=services" OR name:* NEAR(')
+
+    assert response.status_code == 200
+    assert codes(response) == []
+
+
+@pytest.mark.parametrize("query_string, description", [
+    ("", "Missing search query. Use ?q= to search duties and KSBs."),
+    ("?q=%20%20", "Missing search query. Use ?q= to search duties and KSBs."),
+    ("?q=cloud&limit=101", "Invalid limit. Limit must be no more than 100."),
+    ("?q=cloud&limit=0", "Invalid limit. Limit must be a positive integer."),
+    ("?q=cloud&cursor=not-a-cursor", "Invalid cursor."),
+    (f"?q=cloud&cursor={encode_cursor('²')}", "Invalid cursor."),
+])
+def test_invalid_search_returns_400(client, search_index, query_string, description):
+    response = client.get(f"/search{query_string}")
+
+    assert response.status_code == 400
+    assert response.json["description"] == description
@@ -0,0 +1,61 @@
+import pytest
+from models import Knowledge
+from utils import streaming
+
+
+@pytest.fixture(autouse=True)
+def one_item_per_chunk(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_SIZE", 1)
+
+
+@pytest.fixture
+def catalogue(coins_with_duties, coin_without_duties, ksbs):
+    return coins_with_duties
+
+
+def body_chunks(response):
+    return list(response.response)
+
+
+@pytest.mark.parametrize("url", ["/v1/coins", "/v2/coins", "/duties", "/ksbs"])
+def test_streamed_response_matches_buffered_response(client, catalogue, url):
+    buffered = body_chunks(client.get(url))
+    streamed_response = client.get(f"{url}?stream=1")
+    streamed = body_chunks(streamed_response)
+
+    assert len(buffered) == 1
+    assert len(streamed) > 1
+    assert streamed_response.status_code == 200
+    assert streamed_response.content_type == "application/json"
+    assert b"".join(streamed) == buffered[0]
+
+
+@pytest.mark.parametrize("url", ["/v1/coins", "/v2/coins", "/duties", "/ksbs"])
+def test_streamed_empty_collection_is_empty_array(client, url):
+    response = client.get(f"{url}?stream=1")
+
+    assert response.get_data() == b"[]\n"
+
+
+def test_paged_requests_are_not_streamed(client, catalogue):
+    response = client.get("/v1/coins?stream=1&limit=2")
+
+    assert "X-Next-Cursor" in response.headers
+    assert len(body_chunks(response)) == 1
+
+
+def test_collections_above_row_threshold_are_streamed(client, catalogue, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_ROW_THRESHOLD", 5)
+
+    assert len(body_chunks(client.get("/v1/coins"))) > 1
+    assert len(body_chunks(client.get("/duties"))) == 1
+    assert len(body_chunks(client.get("/v1/coins?stream=0"))) == 1
+
+
+def test_streamed_ksbs_are_not_cached(client, ksbs):
+    client.get("/ksbs?stream=1").get_data()
+    Knowledge.create(code="K2", name="Knowledge 2", description="Knowledge 2 Description")
+
+    response = client.get("/ksbs?stream=1")
+
+    assert "K2" in [ksb["code"] for ksb in response.json]
@@ -0,0 +1,57 @@
+import time
+from utils.reference_cache import ReferenceCache
+
+
+def test_get_returns_none_and_counts_miss_for_unknown_key():
+    cache = ReferenceCache()
+
+    assert cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_get_returns_value_and_counts_hit():
+    cache = ReferenceCache()
+    cache.set("key", "value", ["duty"])
+
+    assert cache.get("key") == "value"
+    assert cache.stats()["hits"] == 1
+
+
+def test_set_evicts_least_recently_used_entry_when_full():
+    cache = ReferenceCache(max_entries=2)
+    cache.set("first", 1, ["duty"])
+    cache.set("second", 2, ["duty"])
+    cache.get("first")
+    cache.set("third", 3, ["duty"])
+
+    assert cache.get("second") is None
+    assert cache.get("first") == 1
+    assert cache.get("third") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_get_drops_expired_entries(monkeypatch):
+    cache = ReferenceCache(ttl=10)
+    cache.set("key", "value", ["duty"])
+
+    now = time.monotonic()
+    monkeypatch.setattr("utils.reference_cache.time.monotonic", lambda: now + 11)
+
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_only_drops_entries_built_from_given_tables():
+    cache = ReferenceCache()
+    cache.set("duties", 1, ["duty"])
+    cache.set("duty", 2, ["duty", "coin", "dutycoin"])
+    cache.set("ksbs", 3, ["knowledge", "skill", "behaviour"])
+
+    cache.invalidate(["dutycoin"])
+
+    assert cache.get("duties") == 1
+    assert cache.get("duty") is None
+    assert cache.get("ksbs") == 3
+    assert cache.stats()["invalidations"] == 1
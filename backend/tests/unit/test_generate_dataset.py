@@ -0,0 +1,57 @@
+from generate_dataset import generate, load, clear
+from models import Coin, Duty, Knowledge, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour, TableVersion
+from pg_db_connection import TEST_DB
+from collections import Counter
+
+
+def test_generate_creates_requested_cardinalities():
+    data = generate(coins=200, duties=20, ksbs=10, duties_per_coin=3, ksbs_per_duty=2, seed=1)
+
+    assert len(data[Coin]) == 200
+    assert len(data[Duty]) == 20
+    assert len(data[Knowledge]) == 10
+    assert len({coin["name"] for coin in data[Coin]}) == 200
+    assert len({duty["name"] for duty in data[Duty]}) == 20
+    assert [ksb["code"] for ksb in data[Knowledge][:3]] == ["K1", "K2", "K3"]
+
+
+def test_generate_links_each_coin_to_distinct_duties():
+    data = generate(coins=200, duties=20, duties_per_coin=3, seed=1)
+
+    links_per_coin = Counter(link["coin"] for link in data[DutyCoin])
+    assert set(links_per_coin) == {coin["id"] for coin in data[Coin]}
+    assert max(links_per_coin.values()) <= 5
+    assert len({(link["coin"], link["duty"]) for link in data[DutyCoin]}) == len(data[DutyCoin])
+
+
+def test_generate_is_repeatable_with_a_seed():
+    assert generate(coins=50, duties=10, seed=7) == generate(coins=50, duties=10, seed=7)
+
+
+def test_skew_concentrates_links_on_the_first_duties():
+    def share_of_top_duty(skew):
+        data = generate(coins=500, duties=50, duties_per_coin=2, skew=skew, seed=1)
+        counts = Counter(link["duty"] for link in data[DutyCoin])
+        return counts[data[Duty][0]["id"]] / len(data[DutyCoin])
+
+    assert share_of_top_duty(1.5) > 5 * share_of_top_duty(0)
+
+
+def test_load_inserts_all_rows_and_bumps_versions():
+    data = generate(coins=300, duties=30, ksbs=20, seed=1)
+
+    counts = load(TEST_DB, data)
+
+    assert counts["coin"] == Coin.select().count() == 300
+    assert counts["dutycoin"] == DutyCoin.select().count() == len(data[DutyCoin])
+    assert DutyKnowledge.select().count() + DutySkill.select().count() + DutyBehaviour.select().count() == len(data[DutyKnowledge]) + len(data[DutySkill]) + len(data[DutyBehaviour])
+    assert TableVersion.get_by_id("coin").version == 1
+
+
+def test_clear_removes_generated_rows():
+    load(TEST_DB, generate(coins=20, duties=5, ksbs=5, seed=1))
+
+    clear(TEST_DB)
+
+    assert Coin.select().count() == 0
+    assert DutyCoin.select().count() == 0
@@ -1,4 +1,7 @@
-from utils.helper_functions import serialize_coin, serialize_coin_with_duties, serialize_duty, serialize_ksb, serialize_duty_with_coins, serialize_ksb_with_duties
+from models import Coin, DutyCoin
+from utils.helper_functions import serialize_coin, serialize_coin_with_duties, serialize_coins_with_duties, serialize_duty, serialize_ksb, serialize_ksb_rows, serialize_duty_with_coins, serialize_ksb_with_duties, find_ksb, encode_cursor, decode_cursor
+import pytest
+import uuid
 
 
 # SERIALIZE COIN
@@ -96,10 +99,20 @@ def test_serialize_duty_with_coins_ids_are_strings(duty_with_coins):
 
 def test_serialize_duty_with_coins_has_correct_coins(duty_with_coins):
     result = serialize_duty_with_coins(duty_with_coins)
-    expected_coins = [{"id": str(duty_coin.coin.id), "name": duty_coin.coin.name} for duty_coin in duty_with_coins.duty_coins]
+    expected_coins = [{"id": str(duty_coin.coin.id), "name": duty_coin.coin.name} for duty_coin in duty_with_coins.duty_coins.order_by(DutyCoin.id)]
     assert result["coins"] == expected_coins
 
 
+def test_serialize_duty_with_coins_lists_coins_in_the_order_they_were_linked(duties):
+    coins = [Coin.create(name=f"Coin {i}") for i in range(10)]
+    for coin in reversed(coins):
+        DutyCoin.create(coin=coin, duty=duties[0])
+
+    result = serialize_duty_with_coins(duties[0])
+
+    assert [coin["name"] for coin in result["coins"]] == [f"Coin {i}" for i in reversed(range(10))]
+
+
 # SERIALIZE KSB WITH DUTIES
 def test_serialize_ksb_with_duties_returns_expected_keys(ksbs):
     for ksb in ksbs:
@@ -125,4 +138,65 @@ def test_serialize_ksb_with_duties_has_correct_duties(ksbs_with_duties):
             expected_duties = [{"id": str(duty.id), "code": duty.code, "name": duty.name, "description": duty.description} for duty in ksbs_with_duties["duties"][:2]]
         else:
             expected_duties = [{"id": str(duty.id), "code": duty.code, "name": duty.name, "description": duty.description} for duty in ksbs_with_duties["duties"]]
-        assert result["duties"] == expected_duties
\ No newline at end of file
+        assert result["duties"] == expected_duties
+
+# SERIALIZE COINS WITH DUTIES
+def test_serialize_coins_with_duties_matches_serialize_coin_with_duties(app, coins_with_duties, coin_without_duties):
+    result = serialize_coins_with_duties(Coin.select())
+    expected = [serialize_coin_with_duties(coin) for coin in Coin.select()]
+    assert app.json.loads(app.json.dumps(result)) == expected
+
+
+def test_serialize_coins_with_duties_leaves_ids_as_uuids(coin_with_duties):
+    result = serialize_coins_with_duties(Coin.select())
+    assert isinstance(result[0]["id"], uuid.UUID)
+    assert all(isinstance(duty["id"], uuid.UUID) for duty in result[0]["duties"])
+
+
+# SERIALIZE KSB ROWS
+def test_serialize_ksb_rows_builds_ksb_dicts_from_tuples():
+    ksb_id = uuid.uuid4()
+    result = serialize_ksb_rows([(ksb_id, "K1", "Knowledge 1", "Knowledge 1 Description", "Knowledge", 0)])
+    assert result == [{"id": ksb_id, "code": "K1", "name": "Knowledge 1", "description": "Knowledge 1 Description", "type": "Knowledge"}]
+
+
+# FIND KSB
+def test_find_ksb_returns_ksb_and_type_for_each_prefix(ksbs):
+    for ksb in ksbs:
+        found, ksb_type = find_ksb(ksb.code)
+        assert found.id == ksb.id
+        assert ksb_type == ksb.__class__.__name__
+
+
+def test_find_ksb_returns_none_if_not_found():
+    assert find_ksb("S99") == (None, None)
+
+
+def test_find_ksb_queries_only_the_table_of_its_prefix(ksbs, queries):
+    queries.clear()
+    found, _ = find_ksb(ksbs[1].code)
+
+    assert found.id == ksbs[1].id
+    assert len(queries) == 1
+    assert '"skill"' in queries[0]
+
+
+# CURSORS
+def test_decode_cursor_returns_encoded_sort_key():
+    assert decode_cursor(encode_cursor("Houston, Prepare to Launch!")) == "Houston, Prepare to Launch!"
+
+
+def test_decode_cursor_raises_value_error_if_invalid():
+    for cursor in ["not-a-cursor", encode_cursor(["K1"])]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_decode_cursor_returns_multi_column_sort_key():
+    assert decode_cursor(encode_cursor(["a/b", "K1", "D1"]), key_length=3) == ["a/b", "K1", "D1"]
+
+
+def test_decode_cursor_raises_value_error_if_sort_key_has_wrong_shape():
+    for cursor in [encode_cursor("K1"), encode_cursor(["K1", "D1"]), encode_cursor(["K1", "D1", 3])]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, key_length=3)
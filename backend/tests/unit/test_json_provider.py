@@ -0,0 +1,43 @@
+import uuid
+import pytest
+from flask import Flask
+from utils.json_provider import FastJSONProvider
+
+
+@pytest.fixture
+def payload():
+    return [{"name": "Automate", "id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "duties": []}]
+
+
+def make_app(monkeypatch, encoder):
+    monkeypatch.setenv("JSON_ENCODER", encoder)
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def test_orjson_and_stdlib_responses_are_identical(monkeypatch, payload):
+    fast_app = make_app(monkeypatch, "orjson")
+    stdlib_app = make_app(monkeypatch, "stdlib")
+
+    with fast_app.app_context():
+        fast_body = fast_app.json.response(payload).get_data()
+    with stdlib_app.app_context():
+        stdlib_body = stdlib_app.json.response(payload).get_data()
+
+    assert fast_app.json.use_orjson
+    assert not stdlib_app.json.use_orjson
+    assert fast_body == stdlib_body
+    assert fast_body == b'[{"duties":[],"id":"12345678-1234-5678-1234-567812345678","name":"Automate"}]\n'
+
+
+def test_stdlib_encoder_is_used_when_requested(monkeypatch, payload):
+    app = make_app(monkeypatch, "stdlib")
+
+    assert app.json.dumps(payload) == '[{"duties": [], "id": "12345678-1234-5678-1234-567812345678", "name": "Automate"}]'
+
+
+def test_loads_parses_json(monkeypatch):
+    app = make_app(monkeypatch, "orjson")
+
+    assert app.json.loads(b'{"name": "Automate"}') == {"name": "Automate"}
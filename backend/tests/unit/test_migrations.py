@@ -0,0 +1,71 @@
+from migrations import find_migrations, pending_migrations, migrate, schema_version, create_index
+from models import SchemaMigration
+from pg_db_connection import TEST_DB
+
+JUNCTION_INDEXES = {
+    "dutycoin": ["dutycoin_coin_id_id"],
+    "dutyknowledge": ["dutyknowledge_knowledge_id_id"],
+    "dutyskill": ["dutyskill_skill_id_id"],
+    "dutybehaviour": ["dutybehaviour_behaviour_id_id"],
+}
+
+
+def index_names(table):
+    # Ignores the automatic index SQLite builds for the UNIQUE constraint.
+    return sorted(index.name for index in TEST_DB.get_indexes(table) if not index.name.startswith("sqlite_autoindex"))
+
+
+def make_legacy_schema():
+    # The junction indexes as peewee created them before migration 0001.
+    for table, [index] in JUNCTION_INDEXES.items():
+        TEST_DB.execute_sql(f'DROP INDEX "{index}"')
+        column = index[len(table) + 1:-len("_id")]
+        create_index(TEST_DB, table, ["duty_id"], f"{table}_duty_id")
+        create_index(TEST_DB, table, [column], f"{table}_{column}")
+
+
+def test_migrations_are_numbered_in_order():
+    versions = [version for version, _, _ in find_migrations()]
+
+    assert versions == sorted(versions)
+    assert versions[0] == 1
+
+
+def test_models_match_latest_migration():
+    for table, indexes in JUNCTION_INDEXES.items():
+        assert index_names(table) == indexes
+
+
+def test_migrate_replaces_legacy_junction_indexes_and_records_version():
+    make_legacy_schema()
+    assert index_names("dutycoin") == ["dutycoin_coin_id", "dutycoin_duty_id"]
+
+    applied = migrate(TEST_DB, log=lambda message: None)
+
+    assert 1 in applied
+    assert schema_version(TEST_DB) == find_migrations()[-1][0]
+    for table, indexes in JUNCTION_INDEXES.items():
+        assert index_names(table) == indexes
+
+
+def test_migrate_keeps_data(coins_with_duties):
+    make_legacy_schema()
+
+    migrate(TEST_DB, log=lambda message: None)
+
+    assert len(coins_with_duties[0].coin_duties) == 2
+
+
+def test_migrate_skips_applied_migrations():
+    migrate(TEST_DB, log=lambda message: None)
+
+    assert migrate(TEST_DB, log=lambda message: None) == []
+    assert SchemaMigration.select().count() == len(find_migrations())
+
+
+def test_migrate_applies_cleanly_to_tables_created_from_models():
+    migrate(TEST_DB, log=lambda message: None)
+
+    assert pending_migrations(TEST_DB) == []
+    for table, indexes in JUNCTION_INDEXES.items():
+        assert index_names(table) == indexes
@@ -0,0 +1,70 @@
+import pytest
+from peewee import PostgresqlDatabase
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from pg_db_connection import MonitoredPooledPostgresqlDatabase
+
+
+class FakeConnection:
+    closed = False
+    server_version = 170000
+
+    def get_transaction_status(self):
+        return TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pooled_db(monkeypatch):
+    monkeypatch.setattr(PostgresqlDatabase, "_connect", lambda self: FakeConnection())
+    return MonitoredPooledPostgresqlDatabase("test", max_connections=4, stale_timeout=300, idle_timeout=60)
+
+
+def test_closing_returns_connection_to_pool(pooled_db):
+    pooled_db.connect()
+    first_conn = pooled_db.connection()
+    pooled_db.close()
+
+    pooled_db.connect()
+    assert pooled_db.connection() is first_conn
+    pooled_db.close()
+
+
+def test_pool_stats_reports_utilisation_and_checkouts(pooled_db):
+    pooled_db.connect()
+    stats = pooled_db.pool_stats()
+
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+    assert stats["utilisation"] == 0.25
+    assert stats["checkouts"] == 1
+    assert stats["checkout_wait_max_seconds"] >= 0
+
+    pooled_db.close()
+    stats = pooled_db.pool_stats()
+
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+
+
+def test_close_idle_connections_closes_connections_idle_past_timeout(pooled_db, monkeypatch):
+    pooled_db.connect()
+    conn = pooled_db.connection()
+    pooled_db.close()
+
+    returned_at = pooled_db._returned_at[id(conn)]
+    monkeypatch.setattr("pg_db_connection.time.time", lambda: returned_at + 61)
+
+    assert pooled_db.close_idle_connections() == 1
+    assert conn.closed
+    assert pooled_db.pool_stats()["idle"] == 0
+
+
+def test_close_idle_connections_keeps_recently_used_connections(pooled_db):
+    pooled_db.connect()
+    conn = pooled_db.connection()
+    pooled_db.close()
+
+    assert pooled_db.close_idle_connections() == 0
+    assert not conn.closed
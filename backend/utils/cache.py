@@ -0,0 +1,34 @@
+from flask import request, make_response, g
+from utils.reference_cache import reference_cache
+from utils.table_versions import get_versions
+import functools
+
+
+def cached(*models):
+    tables = [model._meta.table_name for model in models]
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Writes only invalidate the cache of the process that made them,
+            # so the key also holds the table versions. Other gunicorn workers
+            # stop using stale entries once their version cache refreshes.
+            versions = tuple(sorted(get_versions(models).items()))
+            key = (request.path, tuple(sorted(request.args.items(multi=True))), versions)
+
+            hit = reference_cache.get(key)
+            if hit is not None:
+                body, headers = hit
+                g.reference_cache_key = key
+                return make_response(body, 200, headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                headers = {"Content-Type": response.content_type}
+                if "X-Next-Cursor" in response.headers:
+                    headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+                reference_cache.set(key, (response.get_data(), headers), tables)
+                g.reference_cache_key = key
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,212 @@
+from models import Duty, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour
+from utils.helper_functions import KSB_MODELS, KSB_JUNCTIONS, KSB_TYPES_BY_PREFIX, KSB_CODE_REGEX, DUTY_CODE_REGEX
+from utils.table_versions import bump_versions
+from pg_db_connection import database
+from peewee import EXCLUDED, chunked
+import csv
+import json
+import re
+import uuid
+
+IMPORT_BATCH_SIZE = 100
+
+# Keeps IN (...) lists under SQLite's limit on bound parameters.
+LOOKUP_BATCH_SIZE = 500
+
+CATALOGUE_MODELS = {"Duty": Duty, **KSB_MODELS}
+COUNT_KEYS = {"Duty": "duties", "Knowledge": "knowledge", "Skill": "skills", "Behaviour": "behaviours"}
+
+
+class CatalogueError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} catalogue record(s) are invalid.")
+        self.errors = errors
+
+
+def read_catalogue(stream, catalogue_format):
+    # CSV files are read one row at a time. JSON files have to be parsed whole.
+    # Either way each record has type, code, name, description and, for
+    # duties, ksbs: the codes of the duty's KSBs, as a list or separated by
+    # semicolons.
+    if catalogue_format == "csv":
+        yield from csv.DictReader(stream)
+    elif catalogue_format == "json":
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError("A JSON catalogue must be a list of records.")
+        yield from records
+    else:
+        raise ValueError("Catalogue format must be 'csv' or 'json'.")
+
+
+def parse_record(record):
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object.")
+
+    record_type = (record.get("type") or "").strip()
+    if record_type not in CATALOGUE_MODELS:
+        raise ValueError("Invalid type. Type must be 'Duty', 'Knowledge', 'Skill' or 'Behaviour'.")
+
+    code = record.get("code")
+    name = record.get("name")
+    description = record.get("description") or None
+    if not isinstance(code, str) or not code.strip():
+        raise ValueError("Missing 'code'.")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Missing 'name'.")
+    if description is not None and not isinstance(description, str):
+        raise ValueError("'description' must be a string.")
+
+    # Codes are stored upper case, as the GET endpoints look them up that way.
+    code = code.strip().upper()
+    if record_type == "Duty" and not re.match(DUTY_CODE_REGEX, code):
+        raise ValueError(f"Invalid Duty code '{code}'. It must be 'D' followed by numbers, such as D1 or D7.")
+    if record_type != "Duty" and (not re.match(KSB_CODE_REGEX, code) or code[0] != record_type[0]):
+        raise ValueError(f"Invalid {record_type} code '{code}'. It must start with '{record_type[0]}', such as {record_type[0]}1 or {record_type[0]}2b.")
+
+    ksb_codes = record.get("ksbs") or []
+    if isinstance(ksb_codes, str):
+        ksb_codes = ksb_codes.split(";")
+    if not isinstance(ksb_codes, list) or not all(isinstance(ksb_code, str) for ksb_code in ksb_codes):
+        raise ValueError("'ksbs' must be a list of KSB codes.")
+    ksb_codes = [ksb_code.strip().upper() for ksb_code in ksb_codes if ksb_code.strip()]
+    if ksb_codes and record_type != "Duty":
+        raise ValueError("Only duties can list 'ksbs'.")
+    for ksb_code in ksb_codes:
+        if not re.match(KSB_CODE_REGEX, ksb_code):
+            raise ValueError(f"Invalid KSB code '{ksb_code}'.")
+
+    return record_type, {"code": code, "name": name.strip(), "description": description}, ksb_codes
+
+
+class CatalogueImport:
+    # Upserts records by code in batches as they are read, and keeps only the
+    # duty to KSB code pairs in memory until every entity has been written.
+    # Errors are collected rather than raised, so one run reports all of them.
+    def __init__(self):
+        self.errors = []
+        self.pending = {record_type: [] for record_type in CATALOGUE_MODELS}
+        self.seen_codes = {record_type: set() for record_type in CATALOGUE_MODELS}
+        self.seen_names = {record_type: set() for record_type in CATALOGUE_MODELS}
+        self.mappings = {}
+        self.counts = {key: {"created": 0, "updated": 0} for key in COUNT_KEYS.values()}
+        self.counts["mappings"] = {"created": 0, "existing": 0}
+
+    def add(self, index, record):
+        try:
+            record_type, row, ksb_codes = parse_record(record)
+        except ValueError as error:
+            self.errors.append({"index": index, "description": str(error)})
+            return
+
+        if row["code"] in self.seen_codes[record_type]:
+            self.errors.append({"index": index, "description": f"{record_type} code '{row['code']}' is repeated in this catalogue."})
+            return
+        if row["name"] in self.seen_names[record_type]:
+            self.errors.append({"index": index, "description": f"{record_type} name '{row['name']}' is repeated in this catalogue."})
+            return
+        self.seen_codes[record_type].add(row["code"])
+        self.seen_names[record_type].add(row["name"])
+
+        for ksb_code in ksb_codes:
+            self.mappings.setdefault((row["code"], ksb_code), index)
+
+        self.pending[record_type].append((index, row))
+        if len(self.pending[record_type]) >= IMPORT_BATCH_SIZE:
+            self.flush(record_type)
+
+    def flush(self, record_type):
+        model = CATALOGUE_MODELS[record_type]
+        batch = self.pending[record_type]
+        self.pending[record_type] = []
+        if not batch:
+            return
+
+        codes = [row["code"] for _, row in batch]
+        names = [row["name"] for _, row in batch]
+        existing = (model
+                    .select(model.code, model.name)
+                    .where(model.code.in_(codes) | model.name.in_(names))
+                    .tuples())
+        existing_codes = set()
+        codes_by_name = {}
+        for code, name in existing:
+            existing_codes.add(code)
+            codes_by_name[name] = code
+
+        for index, row in batch:
+            other_code = codes_by_name.get(row["name"])
+            if other_code is not None and other_code != row["code"]:
+                self.errors.append({"index": index, "description": f"{record_type} name '{row['name']}' is already used by {other_code}."})
+
+        counts = self.counts[COUNT_KEYS[record_type]]
+        for _, row in batch:
+            counts["updated" if row["code"] in existing_codes else "created"] += 1
+
+        # Nothing will be committed once there are errors, so stop writing.
+        if self.errors:
+            return
+        (model
+         .insert_many([dict(row, id=uuid.uuid4()) for _, row in batch])
+         .on_conflict(
+             conflict_target=[model.code],
+             update={model.name: EXCLUDED.name, model.description: EXCLUDED.description})
+         .execute())
+
+    def link(self):
+        duty_codes = {duty_code for duty_code, _ in self.mappings}
+        duty_ids = lookup_ids(Duty, duty_codes)
+
+        ksb_codes_by_type = {ksb_type: set() for ksb_type in KSB_MODELS}
+        for _, ksb_code in self.mappings:
+            ksb_codes_by_type[KSB_TYPES_BY_PREFIX[ksb_code[0]]].add(ksb_code)
+        ksb_ids = {ksb_type: lookup_ids(KSB_MODELS[ksb_type], ksb_codes) for ksb_type, ksb_codes in ksb_codes_by_type.items()}
+
+        rows_by_type = {ksb_type: [] for ksb_type in KSB_MODELS}
+        for (duty_code, ksb_code), index in self.mappings.items():
+            ksb_type = KSB_TYPES_BY_PREFIX[ksb_code[0]]
+            ksb_id = ksb_ids[ksb_type].get(ksb_code)
+            # KSBs from this catalogue are not written once there are errors,
+            # but should not be reported as missing.
+            if ksb_id is None and ksb_code not in self.seen_codes[ksb_type]:
+                self.errors.append({"index": index, "description": f"{ksb_type} with code '{ksb_code}' does not exist."})
+                continue
+            if not self.errors:
+                junction, ksb_field = KSB_JUNCTIONS[ksb_type]
+                rows_by_type[ksb_type].append({"duty": duty_ids[duty_code], ksb_field.name: ksb_id})
+
+        if self.errors:
+            return
+        for ksb_type, rows in rows_by_type.items():
+            junction, _ = KSB_JUNCTIONS[ksb_type]
+            for batch in chunked(rows, IMPORT_BATCH_SIZE):
+                created = junction.insert_many(batch).on_conflict_ignore().as_rowcount().execute()
+                self.counts["mappings"]["created"] += created
+                self.counts["mappings"]["existing"] += len(batch) - created
+
+    def finish(self):
+        for record_type in CATALOGUE_MODELS:
+            self.flush(record_type)
+        self.link()
+
+
+def lookup_ids(model, codes):
+    ids = {}
+    for batch in chunked(list(codes), LOOKUP_BATCH_SIZE):
+        ids.update(model.select(model.code, model.id).where(model.code.in_(batch)).tuples())
+    return ids
+
+
+def import_catalogue(records):
+    # All or nothing: any invalid record rolls the whole import back and
+    # raises CatalogueError listing every problem by record index.
+    importer = CatalogueImport()
+    with database.atomic():
+        for index, record in enumerate(records):
+            importer.add(index, record)
+        importer.finish()
+        if importer.errors:
+            raise CatalogueError(sorted(importer.errors, key=lambda error: error["index"]))
+
+    bump_versions(Duty, Knowledge, Skill, Behaviour, DutyKnowledge, DutySkill, DutyBehaviour)
+    return importer.counts
@@ -0,0 +1,69 @@
+from flask import request, g
+from utils.reference_cache import reference_cache
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css"}
+
+# Compressed responses get "-<encoding>" appended to their ETag, since a
+# strong ETag has to differ between representations.
+ETAG_ENCODINGS = ["br", "gzip"]
+
+
+def supported_encodings():
+    if brotli is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = request.accept_encodings.best_match(supported_encodings())
+    if encoding is None:
+        return response
+
+    # Responses served from the reference cache keep their compressed bodies
+    # next to the uncompressed one, so each encoding is only compressed once.
+    cache_key = g.get("reference_cache_key")
+    compressed = None
+    if cache_key is not None:
+        compressed = reference_cache.get_variant(cache_key, encoding)
+    if compressed is None:
+        compressed = compress(body, encoding)
+        if cache_key is not None:
+            reference_cache.set_variant(cache_key, encoding, compressed)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
@@ -0,0 +1,98 @@
+from models import Coin, Duty, DutyCoin, Coverage
+from utils.helper_functions import KSB_MODELS, KSB_JUNCTIONS
+from migrations import create_trigger
+from peewee import Tuple
+
+COVERAGE_COLUMNS = "coin_id, duty_id, ksb_type, ksb_id, ksb_code, duty_code"
+
+
+def select_coverage_sql(type_name, where=None):
+    # The coverage rows of one KSB type, from DutyCoin joined to the type's
+    # junction, optionally limited by a WHERE clause on dc (dutycoin) and j
+    # (junction).
+    model = KSB_MODELS[type_name]
+    junction, ksb_field = KSB_JUNCTIONS[type_name]
+    sql = (
+        f"SELECT dc.coin_id, dc.duty_id, '{type_name}', ksb.id, ksb.code, d.code "
+        f'FROM "{DutyCoin._meta.table_name}" AS dc '
+        f'JOIN "{junction._meta.table_name}" AS j ON j.duty_id = dc.duty_id '
+        f'JOIN "{model._meta.table_name}" AS ksb ON ksb.id = j.{ksb_field.column_name} '
+        f'JOIN "{Duty._meta.table_name}" AS d ON d.id = dc.duty_id'
+    )
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def insert_coverage_sql(where=None):
+    return f'INSERT INTO "{Coverage._meta.table_name}" ({COVERAGE_COLUMNS}) ' + " UNION ALL ".join(
+        select_coverage_sql(type_name, where) for type_name in KSB_MODELS)
+
+
+def create_coverage(db):
+    # Creates the coverage table with the triggers that keep it up to date,
+    # then fills it. Each trigger only touches the rows of the coin, duty or
+    # KSB that changed, so the table is never rebuilt after it is created.
+    # Deleted coins and duties are removed by the table's foreign keys.
+    coverage = Coverage._meta.table_name
+    db.create_tables([Coverage], safe=True)
+
+    dutycoin = DutyCoin._meta.table_name
+    delete_coin_duty = f'DELETE FROM "{coverage}" WHERE coin_id = OLD.coin_id AND duty_id = OLD.duty_id'
+    insert_coin_duty = insert_coverage_sql("dc.coin_id = NEW.coin_id AND dc.duty_id = NEW.duty_id")
+    create_trigger(db, f"{dutycoin}_coverage_insert", dutycoin, "INSERT", [insert_coin_duty])
+    create_trigger(db, f"{dutycoin}_coverage_update", dutycoin, "UPDATE", [delete_coin_duty, insert_coin_duty])
+    create_trigger(db, f"{dutycoin}_coverage_delete", dutycoin, "DELETE", [delete_coin_duty])
+
+    for type_name, model in KSB_MODELS.items():
+        junction, ksb_field = KSB_JUNCTIONS[type_name]
+        table = junction._meta.table_name
+        column = ksb_field.column_name
+        delete_duty_ksb = f'DELETE FROM "{coverage}" WHERE duty_id = OLD.duty_id AND ksb_id = OLD.{column}'
+        insert_duty_ksb = (
+            f'INSERT INTO "{coverage}" ({COVERAGE_COLUMNS}) '
+            + select_coverage_sql(type_name, f"j.duty_id = NEW.duty_id AND j.{column} = NEW.{column}"))
+        create_trigger(db, f"{table}_coverage_insert", table, "INSERT", [insert_duty_ksb])
+        create_trigger(db, f"{table}_coverage_update", table, "UPDATE", [delete_duty_ksb, insert_duty_ksb])
+        create_trigger(db, f"{table}_coverage_delete", table, "DELETE", [delete_duty_ksb])
+
+        ksb_table = model._meta.table_name
+        create_trigger(db, f"{ksb_table}_coverage_code", ksb_table, "UPDATE OF code", [
+            f'UPDATE "{coverage}" SET ksb_code = NEW.code WHERE ksb_id = OLD.id'])
+
+    duty = Duty._meta.table_name
+    create_trigger(db, f"{duty}_coverage_code", duty, "UPDATE OF code", [
+        f'UPDATE "{coverage}" SET duty_code = NEW.code WHERE duty_id = OLD.id'])
+
+    rebuild_coverage(db)
+
+
+def rebuild_coverage(db):
+    # Refills the table from the junctions. Only needed after the triggers
+    # were bypassed, or when they are first created.
+    with db.atomic():
+        Coverage.delete().execute()
+        db.execute_sql(insert_coverage_sql())
+
+
+def select_coverage(coin_id=None, ksb_type=None, after=None, limit=None):
+    # Ordered by the table's primary key, (coin, KSB code, duty code), so
+    # pages are read straight from its index. after is the key of the last
+    # row of the previous page.
+    rows = (Coverage
+            .select(Coverage.coin.alias("coin_id"), Coin.name.alias("coin_name"), Coverage.ksb_type,
+                    Coverage.ksb_code, Coverage.duty_code.alias("via_duty"))
+            .join(Coin)
+            .order_by(Coverage.coin, Coverage.ksb_code, Coverage.duty_code))
+    if coin_id is not None:
+        rows = rows.where(Coverage.coin == coin_id)
+    if ksb_type is not None:
+        rows = rows.where(Coverage.ksb_type == ksb_type)
+    if after is not None:
+        after_coin, after_ksb_code, after_duty_code = after
+        rows = rows.where(
+            Tuple(Coverage.coin, Coverage.ksb_code, Coverage.duty_code)
+            > Tuple(Coverage.coin.to_value(after_coin), after_ksb_code, after_duty_code))
+    if limit:
+        rows = rows.limit(limit)
+    return rows
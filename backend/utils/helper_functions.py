@@ -1,4 +1,91 @@
 from playhouse.shortcuts import model_to_dict
+from collections import defaultdict
+import base64
+import json
+from functools import reduce
+from peewee import JOIN, SQL, Value
+from models import Coin, Duty, Knowledge, Skill, Behaviour, DutyCoin, DutyKnowledge, DutySkill, DutyBehaviour
+
+
+DUTY_CODE_REGEX = r"^D\d+$"
+
+KSB_CODE_REGEX = r"^[KSB]\d+[a-zA-Z]?$"
+
+KSB_MODELS = {
+    "Knowledge": Knowledge,
+    "Skill": Skill,
+    "Behaviour": Behaviour,
+}
+
+KSB_TYPES_BY_PREFIX = {type_name[0]: type_name for type_name in KSB_MODELS}
+
+KSB_JUNCTIONS = {
+    "Knowledge": (DutyKnowledge, DutyKnowledge.knowledge),
+    "Skill": (DutySkill, DutySkill.skill),
+    "Behaviour": (DutyBehaviour, DutyBehaviour.behaviour),
+}
+
+KSB_TREE_KEYS = {
+    "Knowledge": "knowledge",
+    "Skill": "skills",
+    "Behaviour": "behaviours",
+}
+
+# Fields that ?fields= can ask for, in the order they are returned.
+COIN_FIELDS = ["id", "name"]
+DUTY_FIELDS = ["id", "code", "name", "description"]
+KSB_FIELDS = ["id", "code", "name", "description", "type"]
+COIN_WITH_DUTIES_FIELDS = COIN_FIELDS + ["duties"] + [f"duties.{name}" for name in DUTY_FIELDS]
+
+
+def parse_fields(fields_arg, allowed):
+    # Turns ?fields=name,code into ["code", "name"], in the order of allowed.
+    # Returns None when no fields were asked for, meaning all of them.
+    if fields_arg is None:
+        return None
+
+    requested = {name.strip() for name in fields_arg.split(",") if name.strip()}
+    if not requested or requested - set(allowed):
+        raise ValueError(f"Invalid fields. Fields must be a comma-separated list of: {', '.join(allowed)}.")
+    return [name for name in allowed if name in requested]
+
+
+def split_coin_fields(fields):
+    # "duties" asks for every duty field and "duties.code" for just one.
+    # duty_fields is None when no duty fields were asked for.
+    coin_fields = [name for name in fields if name in COIN_FIELDS]
+    if "duties" in fields:
+        return coin_fields, DUTY_FIELDS
+    duty_fields = [name.split(".", 1)[1] for name in fields if name.startswith("duties.")]
+    return coin_fields, duty_fields or None
+
+
+def select_fields(rows, fields):
+    for row in rows:
+        yield {name: row[name] for name in fields}
+
+
+def encode_cursor(sort_key):
+    return base64.urlsafe_b64encode(json.dumps(sort_key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, key_length=None):
+    # Sort keys are a string, or a list of key_length strings for lists
+    # sorted by several columns.
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    if key_length is None:
+        valid = isinstance(sort_key, str)
+    else:
+        valid = (isinstance(sort_key, list) and len(sort_key) == key_length
+                 and all(isinstance(part, str) for part in sort_key))
+    if not valid:
+        raise ValueError("Invalid cursor.")
+    return sort_key
+
 
 def serialize_coin(coin):
     coin_dict = model_to_dict(coin)
@@ -9,14 +96,171 @@ def serialize_coin(coin):
 def serialize_coin_with_duties(coin):
     coin_dict = serialize_coin(coin)
 
-    duties = []
-    for duty_coin in coin.coin_duties:
-        duties.append({"id": str(duty_coin.duty.id), "code": duty_coin.duty.code, "name": duty_coin.duty.name, "description": duty_coin.duty.description})
+    duties = (Duty
+              .select()
+              .join(DutyCoin)
+              .where(DutyCoin.coin == coin)
+              .order_by(DutyCoin.id))
+
+    coin_dict["duties"] = [serialize_duty(duty) for duty in duties]
+    return coin_dict
+
+
+def select_coin_duty_rows(coins, duty_fields=DUTY_FIELDS):
+    return (DutyCoin
+            .select(DutyCoin.coin, *[getattr(Duty, name) for name in duty_fields])
+            .join(Duty)
+            .where(DutyCoin.coin.in_(coins.select(Coin.id)))
+            .order_by(DutyCoin.id)
+            .tuples())
+
+
+def attach_duties(coin_rows, duty_rows, duty_fields=DUTY_FIELDS):
+    # Building the dicts with zip() is several times slower than a literal,
+    # so it is only used when fewer fields were asked for.
+    duties_by_coin = defaultdict(list)
+    if duty_fields == DUTY_FIELDS:
+        for coin_id, duty_id, code, name, description in duty_rows:
+            duties_by_coin[coin_id].append({"id": duty_id, "code": code, "name": name, "description": description})
+    else:
+        for coin_id, *values in duty_rows:
+            duties_by_coin[coin_id].append(dict(zip(duty_fields, values)))
+
+    coins_list = []
+    for coin in coin_rows:
+        coin["duties"] = duties_by_coin[coin["id"]]
+        coins_list.append(coin)
+    return coins_list
+
+
+def serialize_coins_with_duties(coins, duty_fields=DUTY_FIELDS):
+    # Built from row projections rather than model instances. Ids are left as
+    # UUIDs for the JSON provider to encode. Only duty_fields are loaded.
+    return attach_duties(coins.dicts(), select_coin_duty_rows(coins, duty_fields), duty_fields)
+
+
+def iter_coins_with_duties(coins, iterate=lambda query: query.iterator(), duty_fields=DUTY_FIELDS):
+    # One left-joined query ordered by coin, so each coin's duties arrive
+    # together and each coin can be yielded as soon as the next one starts.
+    # Duty.id is always selected, to tell coins without duties apart.
+    other_fields = [name for name in duty_fields if name != "id"]
+    rows = (coins
+            .select(Coin.id, Coin.name, Duty.id, *[getattr(Duty, name) for name in other_fields])
+            .join(DutyCoin, JOIN.LEFT_OUTER)
+            .join(Duty, JOIN.LEFT_OUTER)
+            .order_by_extend(DutyCoin.id)
+            .tuples())
+
+    coin = None
+    for coin_id, coin_name, duty_id, *values in iterate(rows):
+        if coin is None or coin["id"] != coin_id:
+            if coin is not None:
+                yield coin
+            coin = {"id": coin_id, "name": coin_name, "duties": []}
+        if duty_id is None:
+            continue
+        if duty_fields == DUTY_FIELDS:
+            code, name, description = values
+            coin["duties"].append({"id": duty_id, "code": code, "name": name, "description": description})
+        else:
+            duty = {"id": duty_id} if "id" in duty_fields else {}
+            duty.update(zip(other_fields, values))
+            coin["duties"].append(duty)
+
+    if coin is not None:
+        yield coin
+
+
+def select_duty_ksb_rows(duty_ids):
+    # One UNION ALL over the three duty-KSB junctions, so the KSBs of any
+    # number of duties are loaded in a single query.
+    queries = []
+    for rank, (type_name, model) in enumerate(KSB_MODELS.items()):
+        junction, ksb_field = KSB_JUNCTIONS[type_name]
+        queries.append(junction
+                       .select(junction.duty.alias("duty_id"), model.id, model.code, model.name, model.description,
+                               Value(type_name).alias("type"), Value(rank).alias("type_rank"))
+                       .join(model, on=(ksb_field == model.id))
+                       .where(junction.duty.in_(duty_ids)))
+
+    return reduce(lambda left, right: left + right, queries).order_by(SQL("type_rank"), SQL("code")).tuples()
+
+
+def serialize_coin_tree(coin):
+    # The coin, its duties and each duty's knowledge, skills and behaviours,
+    # in three queries however many duties and KSBs there are.
+    coin_dict = serialize_coin(coin)
+
+    duty_rows = (Duty
+                 .select(Duty.id, Duty.code, Duty.name, Duty.description)
+                 .join(DutyCoin)
+                 .where(DutyCoin.coin == coin)
+                 .order_by(DutyCoin.id)
+                 .tuples())
+
+    duties_by_id = {}
+    for duty_id, code, name, description in duty_rows:
+        duties_by_id[duty_id] = {
+            "id": duty_id, "code": code, "name": name, "description": description,
+            "knowledge": [], "skills": [], "behaviours": [],
+        }
+
+    if duties_by_id:
+        ksb_rows = select_duty_ksb_rows(DutyCoin.select(DutyCoin.duty).where(DutyCoin.coin == coin))
+        for duty_id, ksb_id, code, name, description, ksb_type, _ in ksb_rows:
+            duties_by_id[duty_id][KSB_TREE_KEYS[ksb_type]].append(
+                {"id": ksb_id, "code": code, "name": name, "description": description})
 
-    coin_dict["duties"] = duties
+    coin_dict["duties"] = list(duties_by_id.values())
     return coin_dict
 
 
+def select_coin_ksbs(coin):
+    # A coin's KSBs are those mapped to any of its duties. A KSB shared by
+    # several of the coin's duties is returned once, deduplicated by DISTINCT.
+    queries = []
+    for rank, (type_name, model) in enumerate(KSB_MODELS.items()):
+        junction, ksb_field = KSB_JUNCTIONS[type_name]
+        queries.append(model
+                       .select(model.id, model.code, model.name, model.description,
+                               Value(type_name).alias("type"), Value(rank).alias("type_rank"))
+                       .join(junction, on=(ksb_field == model.id))
+                       .join(DutyCoin, on=(DutyCoin.duty == junction.duty))
+                       .where(DutyCoin.coin == coin)
+                       .distinct())
+
+    return reduce(lambda left, right: left + right, queries).order_by(SQL("type_rank"), SQL("code")).tuples()
+
+
+def select_ksb_coins(ksb, ksb_type, limit=None, after=None):
+    # Coins with at least one duty mapped to the KSB, ordered by name. A coin
+    # reached through several duties is returned once.
+    junction, ksb_field = KSB_JUNCTIONS[ksb_type]
+    coins = (Coin
+             .select(Coin.id, Coin.name)
+             .join(DutyCoin)
+             .join(junction, on=(junction.duty == DutyCoin.duty))
+             .where(ksb_field == ksb)
+             .distinct()
+             .order_by(Coin.name))
+    if after is not None:
+        coins = coins.where(Coin.name > after)
+    if limit:
+        coins = coins.limit(limit)
+    return coins
+
+
+def resolve_duty_codes(duty_codes):
+    codes = list(dict.fromkeys(code.upper() for code in duty_codes))
+    if not codes:
+        return [], []
+
+    duties_by_code = {duty.code: duty for duty in Duty.select().where(Duty.code.in_(codes))}
+    duties = [duties_by_code[code] for code in codes if code in duties_by_code]
+    unknown_codes = [code for code in codes if code not in duties_by_code]
+    return duties, unknown_codes
+
+
 def serialize_duty(duty):
     return {
         "id": str(duty.id),
@@ -26,6 +270,15 @@ def serialize_duty(duty):
     }
 
 
+def iter_ksb_rows(ksb_rows):
+    for ksb_id, code, name, description, ksb_type, _ in ksb_rows:
+        yield {"id": ksb_id, "code": code, "name": name, "description": description, "type": ksb_type}
+
+
+def serialize_ksb_rows(ksb_rows):
+    return list(iter_ksb_rows(ksb_rows))
+
+
 def serialize_ksb(ksb, ksb_type):
     return {
         "id": str(ksb.id),
@@ -36,10 +289,67 @@ def serialize_ksb(ksb, ksb_type):
     }
 
 
+def select_ksbs(ksb_type=None, code_prefix=None, after=None, limit=None, fields=None):
+    # KSBs are ordered by type (Knowledge, Skill, Behaviour) then code. The
+    # type is given by the code's first letter, so "after" can skip whole
+    # tables before it and only filter codes in its own table. id, name and
+    # description are only selected if they are in fields.
+    after_rank = None
+    if after:
+        after_rank = list(KSB_TYPES_BY_PREFIX).index(after[0])
+
+    queries = []
+    for rank, (type_name, model) in enumerate(KSB_MODELS.items()):
+        if ksb_type and type_name != ksb_type:
+            continue
+        if after_rank is not None and rank < after_rank:
+            continue
+
+        columns = [model.id, model.code, model.name, model.description]
+        if fields is not None:
+            columns = [column for column in columns if column.name == "code" or column.name in fields]
+        query = model.select(
+            *columns,
+            Value(type_name).alias("type"),
+            Value(rank).alias("type_rank"),
+        )
+        if code_prefix:
+            query = query.where(model.code.startswith(code_prefix))
+        if rank == after_rank:
+            query = query.where(model.code > after)
+        queries.append(query)
+
+    if not queries:
+        return None
+
+    ksbs = reduce(lambda left, right: left + right, queries).order_by(SQL("type_rank"), SQL("code"))
+    if limit:
+        ksbs = ksbs.limit(limit)
+    return ksbs
+
+
+def find_ksb(ksb_code):
+    # The code's K/S/B prefix decides the table, so only one is queried.
+    ksb_type = KSB_TYPES_BY_PREFIX[ksb_code[0]]
+    model = KSB_MODELS[ksb_type]
+
+    ksb = model.get_or_none(model.code == ksb_code)
+    if ksb is None:
+        return None, None
+    return ksb, ksb_type
+
+
 def serialize_duty_with_coins(duty):
     duty_dict = model_to_dict(duty)
     duty_dict["id"] = str(duty.id)
-    duty_dict["coins"] = [{"id": str(dc.coin.id), "name": dc.coin.name} for dc in duty.duty_coins]
+
+    coins = (Coin
+             .select(Coin.id, Coin.name)
+             .join(DutyCoin)
+             .where(DutyCoin.duty == duty)
+             .order_by(DutyCoin.id))
+
+    duty_dict["coins"] = [{"id": str(coin.id), "name": coin.name} for coin in coins]
     return duty_dict
 
 
@@ -49,15 +359,12 @@ def serialize_ksb_with_duties(ksb, ksb_type):
     ksb_dict["id"] = str(ksb.id)
     ksb_dict["type"] = ksb_type
 
-    if ksb_type == "Knowledge":
-        duties = [{"id": str(duty_assoc.duty.id), "code": duty_assoc.duty.code, "name": duty_assoc.duty.name, "description": duty_assoc.duty.description} 
-                  for duty_assoc in ksb.knowledge_duties]
-    elif ksb_type == "Skill":
-        duties = [{"id": str(duty_assoc.duty.id), "code": duty_assoc.duty.code, "name": duty_assoc.duty.name, "description": duty_assoc.duty.description} 
-                  for duty_assoc in ksb.skill_duties]
-    elif ksb_type == "Behaviour":
-        duties = [{"id": str(duty_assoc.duty.id), "code": duty_assoc.duty.code, "name": duty_assoc.duty.name, "description": duty_assoc.duty.description} 
-                  for duty_assoc in ksb.behaviour_duties]
-
-    ksb_dict["duties"] = duties
-    return ksb_dict
\ No newline at end of file
+    junction, ksb_field = KSB_JUNCTIONS[ksb_type]
+    duties = (Duty
+              .select()
+              .join(junction)
+              .where(ksb_field == ksb)
+              .order_by(junction.id))
+
+    ksb_dict["duties"] = [serialize_duty(duty) for duty in duties]
+    return ksb_dict
@@ -0,0 +1,45 @@
+from flask.json.provider import DefaultJSONProvider
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    # Uses orjson when it is installed and JSON_ENCODER is not "stdlib",
+    # otherwise behaves exactly like Flask's default provider. orjson writes
+    # UUIDs natively and, unlike the default, leaves non-ASCII text unescaped.
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and os.getenv("JSON_ENCODER", "orjson") != "stdlib"
+
+    def _orjson_options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj):
+        if not self.use_orjson:
+            return super().dumps(obj, separators=(",", ":")).encode()
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+
+    def loads(self, s, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if not self.use_orjson or pretty:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
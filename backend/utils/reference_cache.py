@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import os
+import threading
+import time
+
+
+class ReferenceCache:
+    # Bounded LRU cache of serialized responses. Each entry records the tables
+    # it was built from so writes to those tables can drop it straight away,
+    # and can hold variants of its value, such as compressed bodies.
+    def __init__(self, max_entries=256, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, tables, expires_at, variants = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tables):
+        with self._lock:
+            self._entries[key] = (value, frozenset(tables), time.monotonic() + self.ttl, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_variant(self, key, variant):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry[3].get(variant)
+
+    def set_variant(self, key, variant, value):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[3][variant] = value
+
+    def invalidate(self, tables):
+        tables = set(tables)
+        with self._lock:
+            stale_keys = [key for key, (_, entry_tables, _, _) in self._entries.items() if entry_tables & tables]
+            for key in stale_keys:
+                del self._entries[key]
+            self.invalidations += len(stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+reference_cache = ReferenceCache(
+    max_entries=int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", 256)),
+    ttl=float(os.getenv("REFERENCE_CACHE_TTL", 300))
+)
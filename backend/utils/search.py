@@ -0,0 +1,108 @@
+from models import Duty
+from utils.helper_functions import KSB_MODELS
+from pg_db_connection import database
+from migrations import create_index, create_trigger
+from peewee import PostgresqlDatabase
+import re
+import uuid
+
+SEARCH_MODELS = {"Duty": Duty, **KSB_MODELS}
+
+# Matches in codes and names rank above matches in descriptions.
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', code), 'A') || "
+    "setweight(to_tsvector('english', name), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+SQLITE_COLUMN_WEIGHTS = "10.0, 10.0, 1.0"
+
+
+def create_search_index(db):
+    # PostgreSQL: a generated tsvector column on each searchable table, which
+    # the database keeps up to date, with a GIN index built CONCURRENTLY.
+    # SQLite: one FTS5 table shared by all searchable tables, kept up to date
+    # by triggers. search_entry maps FTS5 rowids to entity type and id, since
+    # SQLite can renumber the implicit rowids of tables with UUID keys.
+    if isinstance(db, PostgresqlDatabase):
+        for model in SEARCH_MODELS.values():
+            table = model._meta.table_name
+            db.execute_sql(
+                f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                f'GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED')
+            create_index(db, table, ["search_vector"], f"{table}_search_vector", method="GIN")
+        return
+
+    db.execute_sql(
+        "CREATE TABLE IF NOT EXISTS search_entry ("
+        "id INTEGER PRIMARY KEY, entity_type TEXT NOT NULL, entity_id TEXT NOT NULL, "
+        "UNIQUE (entity_type, entity_id))")
+    db.execute_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+        "USING fts5(code, name, description, tokenize = 'porter unicode61')")
+
+    for entity_type, model in SEARCH_MODELS.items():
+        table = model._meta.table_name
+        entry_id = f"(SELECT id FROM search_entry WHERE entity_type = '{entity_type}' AND entity_id = old.id)"
+        create_trigger(db, f"{table}_search_insert", table, "INSERT", [
+            f"INSERT INTO search_entry (entity_type, entity_id) VALUES ('{entity_type}', new.id)",
+            "INSERT INTO search_index (rowid, code, name, description) "
+            "VALUES (last_insert_rowid(), new.code, new.name, coalesce(new.description, ''))",
+        ])
+        create_trigger(db, f"{table}_search_update", table, "UPDATE OF code, name, description", [
+            "UPDATE search_index SET code = new.code, name = new.name, description = coalesce(new.description, '') "
+            f"WHERE rowid = {entry_id}",
+        ])
+        create_trigger(db, f"{table}_search_delete", table, "DELETE", [
+            f"DELETE FROM search_index WHERE rowid = {entry_id}",
+            f"DELETE FROM search_entry WHERE id = {entry_id}",
+        ])
+
+        # Index rows that were there before the triggers.
+        db.execute_sql(
+            f"INSERT INTO search_entry (entity_type, entity_id) "
+            f"SELECT '{entity_type}', id FROM \"{table}\" WHERE id NOT IN "
+            f"(SELECT entity_id FROM search_entry WHERE entity_type = '{entity_type}')")
+        db.execute_sql(
+            f"INSERT INTO search_index (rowid, code, name, description) "
+            f"SELECT search_entry.id, t.code, t.name, coalesce(t.description, '') "
+            f"FROM search_entry JOIN \"{table}\" AS t ON t.id = search_entry.entity_id "
+            f"WHERE search_entry.entity_type = '{entity_type}' AND search_entry.id NOT IN (SELECT rowid FROM search_index)")
+
+
+def search_terms(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def search(text, limit, offset=0):
+    # Returns matching duties and KSBs, best match first, as dicts with type,
+    # id, code, name and description.
+    terms = search_terms(text)
+    if not terms:
+        return []
+
+    db = database.obj
+    if isinstance(db, PostgresqlDatabase):
+        branches = " UNION ALL ".join(
+            f"SELECT '{entity_type}' AS type, id, code, name, description, ts_rank(search_vector, query) AS rank "
+            f'FROM "{model._meta.table_name}", websearch_to_tsquery(\'english\', %s) AS query '
+            f"WHERE search_vector @@ query"
+            for entity_type, model in SEARCH_MODELS.items()
+        )
+        sql = f"SELECT type, id, code, name, description FROM ({branches}) AS matches ORDER BY rank DESC, type, code LIMIT %s OFFSET %s"
+        params = [text] * len(SEARCH_MODELS) + [limit, offset]
+    else:
+        # Each term is quoted, so FTS5 query syntax in the input is searched
+        # for rather than interpreted. All terms have to match.
+        sql = (
+            "SELECT search_entry.entity_type, search_entry.entity_id, search_index.code, search_index.name, "
+            "nullif(search_index.description, '') "
+            "FROM search_index JOIN search_entry ON search_entry.id = search_index.rowid "
+            f"WHERE search_index MATCH ? ORDER BY bm25(search_index, {SQLITE_COLUMN_WEIGHTS}), search_entry.entity_type, search_index.code "
+            "LIMIT ? OFFSET ?")
+        params = [" ".join(f'"{term}"' for term in terms), limit, offset]
+
+    return [
+        {"type": entity_type, "id": entity_id if isinstance(entity_id, uuid.UUID) else uuid.UUID(entity_id),
+         "code": code, "name": name, "description": description}
+        for entity_type, entity_id, code, name, description in database.execute_sql(sql, params)
+    ]
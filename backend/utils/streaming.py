@@ -0,0 +1,55 @@
+from flask import current_app, request, stream_with_context
+from playhouse.postgres_ext import PostgresqlExtDatabase, ServerSide
+from pg_db_connection import database
+import os
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Collections with more rows than this are streamed even without ?stream=1.
+# Checking costs a COUNT query, so it is off unless the variable is set.
+STREAM_ROW_THRESHOLD = int(os.getenv("STREAM_ROW_THRESHOLD", 0))
+
+
+def should_stream(query, limit):
+    # Pages are already bounded and need their X-Next-Cursor header before the
+    # body is sent, so only whole collections are streamed.
+    if limit:
+        return False
+
+    stream = request.args.get("stream")
+    if stream is not None:
+        return stream == "1"
+
+    return bool(STREAM_ROW_THRESHOLD) and query.count() > STREAM_ROW_THRESHOLD
+
+
+def iterate_rows(query):
+    # Postgres rows are fetched through a named (server-side) cursor so the
+    # whole result set is never held in memory. SQLite cursors already fetch
+    # lazily.
+    if isinstance(database.obj, PostgresqlExtDatabase):
+        return ServerSide(query)
+    return query.iterator()
+
+
+def stream_json_array(items):
+    # Writes the same bytes as jsonify(list(items)), one chunk at a time.
+    json_provider = current_app.json
+
+    def generate():
+        chunk = [b"["]
+        size = 1
+        for index, item in enumerate(items):
+            encoded = json_provider.dumps_bytes(item)
+            if index:
+                chunk.append(b",")
+            chunk.append(encoded)
+            size += len(encoded) + 1
+            if size >= STREAM_CHUNK_SIZE:
+                yield b"".join(chunk)
+                chunk = []
+                size = 0
+        chunk.append(b"]\n")
+        yield b"".join(chunk)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=json_provider.mimetype)
@@ -0,0 +1,70 @@
+from flask import request, make_response
+from models import TableVersion
+from utils.reference_cache import reference_cache
+from utils.compression import ETAG_ENCODINGS
+import functools
+import hashlib
+import os
+import time
+
+# Versions are read from the tableversion table and kept in memory for
+# VERSIONS_TTL seconds, so conditional GETs inside that window are answered
+# without a query. Writes made by this process are seen immediately.
+VERSIONS_TTL = float(os.getenv("TABLE_VERSIONS_TTL", 1))
+
+cached_versions = {}
+cached_at = None
+
+
+def clear_cached_versions():
+    global cached_at
+    cached_at = None
+
+
+def get_versions(models):
+    # The dict is replaced rather than updated in place, so threads reading
+    # it while another thread refreshes it never see it half filled.
+    global cached_versions, cached_at
+    if cached_at is None or time.monotonic() - cached_at > VERSIONS_TTL:
+        cached_versions = {row.table_name: row.version for row in TableVersion.select()}
+        cached_at = time.monotonic()
+
+    versions = cached_versions
+    return {model._meta.table_name: versions.get(model._meta.table_name, 0) for model in models}
+
+
+def bump_versions(*models):
+    for model in models:
+        (TableVersion
+         .insert(table_name=model._meta.table_name, version=1)
+         .on_conflict(
+             conflict_target=[TableVersion.table_name],
+             update={TableVersion.version: TableVersion.version + 1})
+         .execute())
+    clear_cached_versions()
+    reference_cache.invalidate(model._meta.table_name for model in models)
+
+
+def make_etag(path, versions):
+    key = path + "|" + ",".join(f"{name}:{version}" for name, version in sorted(versions.items()))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional_get(*models):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = make_etag(request.full_path, get_versions(models))
+
+            for candidate in [etag] + [f"{etag}-{encoding}" for encoding in ETAG_ENCODINGS]:
+                if request.if_none_match.contains(candidate):
+                    response = make_response("", 304)
+                    response.set_etag(candidate)
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator